@@ -10,6 +10,9 @@ from discord.ext import commands
 from aiohttp import web
 
 from .config.settings import Settings
+from .utils.cache import video_cache, search_cache, stream_cache
+from .utils.persistent_cache import persistent_cache
+from .utils.extraction_executor import extraction_executor
 
 
 # Configurar logging
@@ -60,6 +63,22 @@ class MusicBot(commands.Bot):
             except Exception as e:
                 logger.error(f'❌ Error cargando {ext}: {e}')
 
+        # Limpieza periódica de los cachés de videos, búsquedas y URLs de stream
+        video_cache.start_sweeper(Settings.CACHE_SWEEP_INTERVAL)
+        search_cache.start_sweeper(Settings.CACHE_SWEEP_INTERVAL)
+        stream_cache.start_sweeper(Settings.CACHE_SWEEP_INTERVAL)
+
+        # Caché persistente (sobrevive a reinicios/despliegues)
+        if persistent_cache:
+            await persistent_cache.start()
+
+    async def close(self):
+        """Volcar cachés pendientes antes de cerrar"""
+        if persistent_cache:
+            await persistent_cache.close()
+        extraction_executor.shutdown()
+        await super().close()
+
     async def on_ready(self):
         """Evento cuando el bot está listo"""
         logger.info('=' * 50)
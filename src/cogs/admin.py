@@ -13,6 +13,20 @@ from ..utils.embeds import (
     create_info_embed,
     create_error_embed
 )
+from ..utils.cache import video_cache, stream_cache, failure_cache, search_cache
+from ..utils.persistent_cache import persistent_cache
+from ..utils.match_index import spotify_match_index
+from ..utils.frame_cache import frame_cache
+from ..utils.broadcast import broadcast_hub
+from ..utils.extraction_executor import extraction_executor
+from ..utils.extraction_health import extraction_health
+from ..utils.extraction_scheduler import (
+    extraction_scheduler,
+    PRIORITIES,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_PREFETCH,
+    PRIORITY_BULK
+)
 from ..config.settings import Settings
 
 
@@ -82,6 +96,7 @@ class Admin(commands.Cog):
             f"`{Settings.PREFIX}stop` - Detener y limpiar cola",
             f"`{Settings.PREFIX}volume` / `vol` - Ajustar volumen (0-100)",
             f"`{Settings.PREFIX}nowplaying` / `np` - Canción actual",
+            f"`{Settings.PREFIX}seek` - Saltar a un tiempo (1:30 o segundos)",
             f"`{Settings.PREFIX}queue` / `q` - Ver cola",
             f"`{Settings.PREFIX}loop` - Configurar repetición",
             f"`{Settings.PREFIX}shuffle` - Mezclar cola",
@@ -128,6 +143,7 @@ class Admin(commands.Cog):
         info_commands = [
             f"`{Settings.PREFIX}help` / `h` - Mostrar esta ayuda",
             f"`{Settings.PREFIX}stats` - Estadísticas del bot",
+            f"`{Settings.PREFIX}metrics` - Métricas de caché y extracción",
             f"`{Settings.PREFIX}ping` - Ver latencia"
         ]
 
@@ -212,6 +228,140 @@ class Admin(commands.Cog):
 
         await ctx.send(embed=embed)
 
+    @commands.command(name='metrics', aliases=['cachestats'])
+    async def metrics(self, ctx):
+        """Mostrar métricas internas de caché y extracción"""
+        cache_stats = video_cache.get_stats()
+        stream_stats = stream_cache.get_stats()
+
+        embed = discord.Embed(
+            title="📈 Métricas Internas",
+            color=discord.Color.blue()
+        )
+
+        embed.add_field(
+            name="💾 Caché de videos",
+            value=(
+                f"Entradas: {cache_stats['entries']}/{cache_stats['max_entries']}\n"
+                f"Memoria: {cache_stats['bytes'] / 1024 / 1024:.1f}/{cache_stats['max_bytes'] / 1024 / 1024:.0f} MB\n"
+                f"Aciertos: {cache_stats['hits']} | Fallos: {cache_stats['misses']} "
+                f"({cache_stats['hit_rate'] * 100:.0f}%)\n"
+                f"Expulsadas: {cache_stats['evictions']} | Expiradas: {cache_stats['expirations']}"
+            ),
+            inline=False
+        )
+
+        search_stats = search_cache.get_stats()
+        embed.add_field(
+            name="🔍 Caché de búsquedas",
+            value=(
+                f"Entradas: {search_stats['entries']}/{search_stats['max_entries']}\n"
+                f"Aciertos: {search_stats['hits']} | Fallos: {search_stats['misses']} "
+                f"({search_stats['hit_rate'] * 100:.0f}%)"
+            ),
+            inline=False
+        )
+
+        embed.add_field(
+            name="🔗 URLs de stream",
+            value=f"Entradas: {stream_stats['entries']}",
+            inline=True
+        )
+
+        match_stats = spotify_match_index.get_stats()
+        embed.add_field(
+            name="🎧 Spotify → YouTube",
+            value=(
+                f"Emparejados: {match_stats['hits']} | Buscados: {match_stats['misses']} "
+                f"({match_stats['hit_rate'] * 100:.0f}%)"
+            ),
+            inline=True
+        )
+
+        failure_stats = failure_cache.get_stats()
+        embed.add_field(
+            name="🚫 No disponibles",
+            value=f"Videos: {failure_stats['entries']} | Evitadas: {failure_stats['hits']}",
+            inline=True
+        )
+
+        executor_stats = extraction_executor.get_stats()
+        embed.add_field(
+            name=f"⚙️ Extracción (yt-dlp, {executor_stats['backend']})",
+            value=(
+                f"Activas: {executor_stats['active']}/{executor_stats['max_workers']}\n"
+                f"Completadas: {executor_stats['completed']} | Fallidas: {executor_stats['failed']}"
+            ),
+            inline=False
+        )
+
+        health_stats = extraction_health.get_stats()
+        if health_stats['open']:
+            circuit = f"🔴 Masivas en pausa ({health_stats['cooldown']}s)"
+        else:
+            circuit = "🟢 Normal"
+        embed.add_field(
+            name="🚦 Salud de YouTube",
+            value=(
+                f"{circuit}\n"
+                f"Concurrencia: {health_stats['limit']}/{health_stats['max_limit']}\n"
+                f"Bloqueos (429/anti-bots): {health_stats['throttles']}"
+            ),
+            inline=False
+        )
+
+        scheduler_stats = extraction_scheduler.get_stats()
+        labels = {PRIORITY_INTERACTIVE: 'Interactivas', PRIORITY_PREFETCH: 'Prefetch', PRIORITY_BULK: 'Masivas'}
+        embed.add_field(
+            name=f"🗂️ Planificador ({scheduler_stats['active']}/{scheduler_stats['budget']} activas)",
+            value="\n".join(
+                f"{labels[priority]}: {scheduler_stats[priority]['queued']} en cola | "
+                f"{scheduler_stats[priority]['dispatched']} servidas | "
+                f"espera media {scheduler_stats[priority]['avg_wait_ms']} ms "
+                f"(máx {scheduler_stats[priority]['max_wait_ms']} ms)"
+                for priority in PRIORITIES
+            ),
+            inline=False
+        )
+
+        frame_stats = frame_cache.get_stats()
+        embed.add_field(
+            name="♻️ Caché de audio (Opus)",
+            value=(
+                f"Memoria: {frame_stats['memory_entries']} ({frame_stats['memory_mb']} MB) | "
+                f"Disco: {frame_stats['disk_entries']} ({frame_stats['disk_mb']} MB) | "
+                f"Grabando: {frame_stats['recording']} ({frame_stats['recording_mb']} MB)\n"
+                f"Aciertos: {frame_stats['hits']} (disco: {frame_stats['disk_hits']}) | "
+                f"Tasa: {frame_stats['hit_rate']:.0%}"
+            ),
+            inline=False
+        )
+
+        broadcast_stats = broadcast_hub.get_stats()
+        embed.add_field(
+            name="📡 Streams compartidos",
+            value=(
+                f"Activos: {broadcast_stats['active']} | Oyentes: {broadcast_stats['listeners']} | "
+                f"En buffer: {broadcast_stats['buffered']} paquetes\n"
+                f"Uniones: {broadcast_stats['joined']} | Fuera de ventana: {broadcast_stats['late']} | "
+                f"Retrasados: {broadcast_stats['detached']}"
+            ),
+            inline=True
+        )
+
+        if persistent_cache:
+            disk_stats = persistent_cache.get_stats()
+            embed.add_field(
+                name="💿 Caché en disco",
+                value=(
+                    f"Aciertos: {disk_stats['hits']} | Fallos: {disk_stats['misses']}\n"
+                    f"Escritas: {disk_stats['writes']} | Pendientes: {disk_stats['pending']}"
+                ),
+                inline=True
+            )
+
+        await ctx.send(embed=embed)
+
     @commands.command(name='info', aliases=['about', 'botinfo'])
     async def info(self, ctx):
         """Información sobre el bot"""
@@ -5,19 +5,42 @@ Implementa: play, pause, resume, skip, stop, volume, nowplaying, queue, loop, sh
 import discord
 from discord.ext import commands
 import asyncio
-from typing import Optional
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Tuple
 import logging
 
 from ..utils.song import Song
 from ..utils.queue_manager import QueueManager
 from ..utils.youtube_handler import YouTubeHandler
 from ..utils.spotify_handler import SpotifyHandler
+from ..utils.prefetcher import StreamPrefetcher
+from ..utils.match_index import spotify_match_index
+from ..utils import track_matcher
+from ..utils.extraction_health import extraction_health
+from ..utils.extraction_scheduler import PRIORITY_BULK
+from ..utils.url_parser import parse_youtube_url, canonical_video_url, canonical_playlist_url
+from ..utils.audio_source import (
+    create_audio_source,
+    set_live_volume,
+    playback_mode,
+    PLAYBACK_OPUS,
+    CachedOpusSource,
+    PrimedSource,
+    TrackedSource,
+    PRIME_FRAMES,
+    FRAMES_PER_SECOND
+)
+from ..utils.frame_cache import frame_cache
+from ..utils.broadcast import broadcast_hub
 from ..utils.embeds import (
     create_now_playing_embed,
     create_queue_embed,
     create_search_results_embed,
     create_error_embed,
-    create_success_embed
+    create_success_embed,
+    create_info_embed
 )
 from ..config.settings import Settings
 
@@ -37,14 +60,23 @@ class Music(commands.Cog):
     def get_guild_state(self, guild_id):
         """Obtener o crear estado del servidor"""
         if guild_id not in self.guild_states:
+            queue = QueueManager(max_size=Settings.MAX_QUEUE_SIZE)
             self.guild_states[guild_id] = {
                 'voice_client': None,
-                'queue': QueueManager(max_size=Settings.MAX_QUEUE_SIZE),
+                'queue': queue,
+                'prefetcher': StreamPrefetcher(
+                    self.youtube, queue, depth=Settings.PREFETCH_DEPTH, guild_id=guild_id
+                ),
                 'current_song': None,
                 'volume': Settings.DEFAULT_VOLUME / 100,
                 'last_channel': None,
                 'auto_shuffle': True,  # Auto-shuffle para playlists
-                'consecutive_failures': 0  # Contador de fallos consecutivos
+                'consecutive_failures': 0,  # Contador de fallos consecutivos
+                'ingesting': 0,  # Playlists cargándose ahora mismo
+                'ingest_generation': 0,  # Se incrementa con stop/clear/leave para cortar cargas en curso
+                'preloaded': None,  # (Song, source) de la siguiente canción ya preparada (gapless)
+                'tracked': None,  # TrackedSource de la canción actual (posición)
+                'resume_attempts': 0  # Reanudaciones de la canción actual tras cortes del stream
             }
         return self.guild_states[guild_id]
 
@@ -89,6 +121,8 @@ class Music(commands.Cog):
             state['voice_client'].stop()
 
         state['queue'].clear()
+        state['prefetcher'].cancel()
+        state['ingest_generation'] += 1
         state['current_song'] = None
 
         await state['voice_client'].disconnect()
@@ -113,6 +147,11 @@ class Music(commands.Cog):
         state = self.get_guild_state(ctx.guild.id)
         state['last_channel'] = ctx.channel
 
+        # Playlists y álbumes: carga progresiva, empieza a sonar con la primera canción
+        if self.youtube.is_playlist(query) or self.spotify.get_url_type(query) in ('album', 'playlist'):
+            await self._ingest_playlist(ctx, state, query)
+            return
+
         async with ctx.typing():
             songs = None
 
@@ -128,63 +167,55 @@ class Music(commands.Cog):
                 songs = await self._handle_search(ctx, query)
 
             if not songs:
-                await ctx.send(embed=create_error_embed("Error", "No se pudo encontrar la canción."))
+                reason = self.youtube.get_failure(query) if self.youtube.is_url(query) else None
+                message = f"Este video no se puede reproducir ({reason})." if reason else "No se pudo encontrar la canción."
+                await ctx.send(embed=create_error_embed("Error", message))
                 return
 
-            # Añadir canciones a la cola
-            added_count = 0
-            for song in songs:
-                if state['queue'].add(song):
-                    added_count += 1
-                else:
-                    break  # Cola llena
+            # Descartar videos que ya sabemos que no se pueden reproducir
+            song = songs[0]
+            reason = self.youtube.get_failure(song.url)
+            if reason:
+                await ctx.send(embed=create_error_embed("Error", f"Este video no se puede reproducir ({reason})."))
+                return
 
-            # Auto-shuffle para playlists
-            if added_count > 1 and state.get('auto_shuffle', True):
-                state['queue'].shuffle()
-                logger.info(f'Auto-shuffled playlist with {added_count} songs')
+            # Añadir a la cola (las playlists van por _ingest_playlist)
+            if not state['queue'].add(song):
+                await ctx.send(embed=create_error_embed("Error", "La cola está llena."))
+                return
 
             # Si no hay nada reproduciéndose, empezar
             if not state['voice_client'].is_playing() and not state['voice_client'].is_paused():
                 await self._play_next(ctx.guild.id)
             else:
+                # Las nuevas canciones pueden ser las siguientes - pre-resolverlas
+                state['prefetcher'].invalidate()
+
                 # Informar que se añadió a la cola
-                if added_count == 1:
-                    embed = create_success_embed(
-                        "Añadido a la cola",
-                        f"**{songs[0].title}**"
-                    )
-                    embed.set_thumbnail(url=songs[0].thumbnail)
-                    await ctx.send(embed=embed)
-                else:
-                    shuffle_text = " (mezcladas aleatoriamente)" if state.get('auto_shuffle', True) else ""
-                    await ctx.send(embed=create_success_embed(
-                        "Añadido a la cola",
-                        f"{added_count} canciones añadidas a la cola{shuffle_text}."
-                    ))
+                embed = create_success_embed(
+                    "Añadido a la cola",
+                    f"**{song.title}**"
+                )
+                embed.set_thumbnail(url=song.thumbnail)
+                await ctx.send(embed=embed)
 
     async def _handle_youtube_url(self, url, requester):
         """
-        Manejar URL de YouTube
-        OPTIMIZADO: Usa lazy loading para playlists (10-20x más rápido)
+        Manejar URL de un video de YouTube (las playlists van por _ingest_playlist)
         """
         try:
-            if self.youtube.is_playlist(url):
-                # Es una playlist - usar lazy loading (solo metadata básica)
-                entries = await self.youtube.get_playlist(url, max_songs=Settings.MAX_QUEUE_SIZE)
-                songs = []
-                for entry in entries:
-                    # from_youtube_info funciona con info básica también
-                    song = Song.from_youtube_info(entry, requester)
-                    songs.append(song)
-                logger.info(f'✓ Playlist cargada rápidamente: {len(songs)} canciones')
-                return songs
-            else:
-                # Video individual - obtener info completa
-                info = await self.youtube.extract_info(url)
-                if info:
-                    song = Song.from_youtube_info(info, requester)
-                    return [song]
+            ref = parse_youtube_url(url)
+            if not ref:
+                return None
+
+            # Video individual (también desde un Mix) - obtener info completa
+            track = await self.youtube.extract_info(
+                canonical_video_url(ref.video_id), guild_id=requester.guild.id
+            )
+            if track:
+                # Incluye el formato de audio ya resuelto (evita 2ª extracción)
+                song = Song.from_track_info(track, requester)
+                return [song]
             return None
         except Exception as e:
             logger.error(f'Error handling YouTube URL: {e}')
@@ -192,66 +223,204 @@ class Music(commands.Cog):
 
     async def _handle_spotify_url(self, url, requester):
         """
-        Manejar URL de Spotify
-        OPTIMIZADO: Búsquedas en lotes controlados (evita bloqueo del bot)
-        Máximo 10 búsquedas simultáneas para no bloquear el event loop
+        Manejar URL de un track de Spotify (álbumes y playlists van por _ingest_playlist)
         """
         if not self.spotify.is_available():
             logger.error('Spotify not available')
             return None
 
         try:
-            # Obtener tracks de Spotify
-            tracks = await self.spotify.process_url(url)
-
-            if not tracks:
+            track = await self.spotify.get_track_info(url)
+            if not track:
                 return None
 
-            # Limitar a máximo razonable
-            tracks_to_process = tracks[:min(len(tracks), Settings.MAX_QUEUE_SIZE)]
-
-            # Semáforo para limitar concurrencia (máximo 10 búsquedas simultáneas)
-            semaphore = asyncio.Semaphore(10)
-
-            async def search_track_limited(track):
-                """Buscar un track con límite de concurrencia y timeout"""
-                async with semaphore:
-                    try:
-                        query = self.spotify.to_youtube_query(track)
-                        # Timeout de 10 segundos por búsqueda
-                        results = await asyncio.wait_for(
-                            self.youtube.search(query, limit=1),
-                            timeout=10.0
-                        )
-                        if results:
-                            song = Song.from_youtube_info(results[0], requester)
-                            song.source = 'spotify'
-                            return song
-                    except asyncio.TimeoutError:
-                        logger.warning(f'⏱️  Timeout buscando: {track.get("name", "Unknown")}')
-                    except Exception as e:
-                        logger.error(f'❌ Error searching track {track.get("name")}: {e}')
-                    return None
-
-            # Procesar con control de concurrencia
-            logger.info(f'🔍 Buscando {len(tracks_to_process)} tracks (máx 10 simultáneos)...')
-            tasks = [search_track_limited(track) for track in tracks_to_process]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Filtrar resultados válidos
-            songs = [r for r in results if isinstance(r, Song)]
-
-            logger.info(f'✓ Encontradas {len(songs)}/{len(tracks_to_process)} canciones de Spotify')
+            songs = [song async for song in self._iter_spotify_songs([track], requester) if song]
             return songs if songs else None
 
         except Exception as e:
             logger.error(f'Error handling Spotify URL: {e}')
             return None
 
+    async def _iter_spotify_songs(self, tracks: List[dict], requester) -> AsyncIterator[Optional[Song]]:
+        """
+        Buscar en YouTube los tracks de Spotify y entregarlos según se resuelven
+        OPTIMIZADO: consulta primero el índice de correspondencias ya resueltas;
+        máximo 10 tracks resolviéndose a la vez (índice y búsqueda); las canciones
+        se entregan en el orden de la lista en cuanto están listas las anteriores
+
+        Yields:
+            Song, o None si un track no se encontró
+        """
+        max_in_flight = 10
+
+        def to_song(entry):
+            song = Song.from_youtube_info(entry, requester)
+            song.source = 'spotify'
+            return song
+
+        async def resolve_track(track):
+            """Resolver un track: índice de correspondencias o búsqueda con timeout"""
+            # Track ya emparejado antes: sin búsqueda en YouTube
+            match = await spotify_match_index.get(track)
+            if match:
+                entry = spotify_match_index.to_entry(match)
+                if not self.youtube.get_failure(entry['url']):
+                    return to_song(entry)
+
+            try:
+                query = self.spotify.to_youtube_query(track)
+                # Timeout de 10 segundos por búsqueda
+                # Varios candidatos en la misma búsqueda para elegir sin peticiones extra
+                results = await asyncio.wait_for(
+                    self.youtube.search(
+                        query, limit=Settings.SPOTIFY_MATCH_CANDIDATES,
+                        priority=PRIORITY_BULK, guild_id=requester.guild.id
+                    ),
+                    timeout=10.0
+                )
+                best, confidence = track_matcher.pick_best(track, results)
+                if best:
+                    # Solo se recuerdan los emparejamientos fiables
+                    if confidence >= Settings.SPOTIFY_MATCH_MIN_CONFIDENCE:
+                        spotify_match_index.set(track, best, confidence)
+                    else:
+                        logger.debug(f'🤔 Emparejamiento dudoso ({confidence:.2f}): {track.get("name")} → {best.get("title")}')
+                    return to_song(best)
+            except asyncio.TimeoutError:
+                logger.warning(f'⏱️  Timeout buscando: {track.get("name", "Unknown")}')
+            except Exception as e:
+                logger.error(f'❌ Error searching track {track.get("name")}: {e}')
+            return None
+
+        logger.info(f'🔍 Buscando {len(tracks)} tracks (máx {max_in_flight} simultáneos)...')
+        remaining = iter(tracks)
+        in_flight: Deque[asyncio.Task] = deque()
+        try:
+            while True:
+                # Ventana deslizante: los siguientes tracks se resuelven mientras se entrega el primero
+                while len(in_flight) < max_in_flight:
+                    track = next(remaining, None)
+                    if track is None:
+                        break
+                    in_flight.append(asyncio.create_task(resolve_track(track)))
+                if not in_flight:
+                    break
+                yield await in_flight.popleft()
+        finally:
+            # Carga cancelada (stop/clear o cola llena): no seguir buscando
+            for task in in_flight:
+                task.cancel()
+
+    async def _open_playlist_source(self, url, requester, shuffle: bool) -> Tuple[Optional[AsyncIterator], int]:
+        """
+        Obtener la lista de una playlist de YouTube o de un álbum/playlist de Spotify
+
+        Returns:
+            Tuple: (iterador asíncrono de Song/None, número total de entradas)
+        """
+        ref = parse_youtube_url(url)
+        if ref and ref.is_playlist:
+            # Lazy loading: solo metadata básica, la extracción completa la hace el prefetcher
+            entries = await self.youtube.get_playlist(
+                canonical_playlist_url(ref.playlist_id), max_songs=Settings.MAX_QUEUE_SIZE,
+                guild_id=requester.guild.id
+            )
+            if shuffle:
+                random.shuffle(entries)
+
+            async def iter_entries():
+                for entry in entries:
+                    yield Song.from_youtube_info(entry, requester)
+
+            return iter_entries(), len(entries)
+
+        if not self.spotify.is_available():
+            logger.error('Spotify not available')
+            return None, 0
+
+        tracks = (await self.spotify.process_url(url))[:Settings.MAX_QUEUE_SIZE]
+        if shuffle:
+            random.shuffle(tracks)
+        return self._iter_spotify_songs(tracks, requester), len(tracks)
+
+    async def _ingest_playlist(self, ctx, state, url):
+        """
+        Cargar una playlist de forma progresiva
+        OPTIMIZADO: cada canción se añade a la cola en cuanto se resuelve y la
+        reproducción empieza con la primera, en vez de esperar a la lista entera.
+        El progreso se muestra editando un único mensaje
+        """
+        shuffle = state.get('auto_shuffle', True)
+        generation = state['ingest_generation']
+        status = await ctx.send(embed=create_info_embed("Cargando playlist", "⏳ Obteniendo canciones..."))
+
+        songs, total = await self._open_playlist_source(url, ctx.author, shuffle)
+        if not total:
+            await status.edit(embed=create_error_embed("Error", "No se pudo cargar la playlist."))
+            return
+
+        added = failed = 0
+        queue_full = False
+        last_update = time.monotonic()
+
+        state['ingesting'] += 1
+        try:
+            async for song in songs:
+                if state['ingest_generation'] != generation:
+                    break  # !stop, !clear o !leave durante la carga
+
+                if song is None or self.youtube.get_failure(song.url):
+                    failed += 1
+                    continue
+
+                if not state['queue'].add(song):
+                    queue_full = True
+                    break
+                added += 1
+
+                voice_client = state['voice_client']
+                if (voice_client and voice_client.is_connected() and state['current_song'] is None
+                        and not voice_client.is_playing() and not voice_client.is_paused()):
+                    # Primera canción lista: empezar ya
+                    await self._play_next(ctx.guild.id)
+                elif len(state['queue']) <= Settings.PREFETCH_DEPTH:
+                    # Puede ser la siguiente - pre-resolverla
+                    state['prefetcher'].invalidate()
+
+                # Editar el mensaje como mucho cada 2 segundos (rate limit de Discord)
+                if time.monotonic() - last_update >= 2:
+                    last_update = time.monotonic()
+                    await status.edit(embed=create_info_embed(
+                        "Cargando playlist",
+                        f"⏳ {added + failed}/{total} procesadas · {added} añadidas a la cola..."
+                    ))
+        finally:
+            state['ingesting'] -= 1
+            await songs.aclose()
+
+        if state['ingest_generation'] != generation:
+            await status.edit(embed=create_info_embed("Carga cancelada", f"{added} canciones se llegaron a añadir."))
+            return
+
+        if not added:
+            await status.edit(embed=create_error_embed("Error", "No se pudo encontrar ninguna canción de la playlist."))
+            return
+
+        shuffle_text = " (mezcladas aleatoriamente)" if shuffle else ""
+        summary = f"{added} canciones añadidas a la cola{shuffle_text}."
+        if failed:
+            summary += f"\n⚠️ {failed} no se encontraron o no están disponibles."
+        if queue_full:
+            summary += "\n📦 La cola está llena."
+        logger.info(f'✓ Playlist cargada progresivamente: {added}/{total} canciones')
+        await status.edit(embed=create_success_embed("Playlist cargada", summary))
+
     async def _handle_search(self, ctx, query):
         """Manejar búsqueda por nombre"""
         try:
-            results = await self.youtube.search(query, limit=Settings.SEARCH_RESULTS_LIMIT)
+            results = await self.youtube.search(
+                query, limit=Settings.SEARCH_RESULTS_LIMIT, guild_id=ctx.guild.id
+            )
 
             if not results:
                 return None
@@ -301,6 +470,17 @@ class Music(commands.Cog):
         if not state:
             return
 
+        # Stream cortado antes de tiempo (URL caducada, corte de red): seguir
+        # por donde iba en vez de pasar a la siguiente o empezar de cero
+        previous, state['tracked'] = state['tracked'], None
+        song = state['current_song']
+        if previous and song and previous.ended_early():
+            if state['resume_attempts'] < 3:
+                state['resume_attempts'] += 1
+                if await self._resume_song(guild_id, song, previous.position):
+                    return
+            logger.warning(f'⚠️  No se pudo reanudar "{song.title}", pasando a la siguiente')
+
         # Verificar límite de fallos consecutivos
         if state.get('consecutive_failures', 0) >= 5:
             logger.error(f'⛔ Demasiados fallos consecutivos ({state["consecutive_failures"]}), deteniendo reproducción')
@@ -312,15 +492,21 @@ class Music(commands.Cog):
                 ))
             state['consecutive_failures'] = 0
             state['current_song'] = None
+            self._discard_preloaded(state)
             return
 
         # Obtener siguiente canción
         next_song = state['queue'].next()
+        preloaded_song, preloaded_source = state['preloaded'] or (None, None)
+        state['preloaded'] = None
 
         if not next_song:
+            if preloaded_source:
+                preloaded_source.cleanup()
             state['current_song'] = None
             state['consecutive_failures'] = 0
-            if state['last_channel']:
+            # Si hay una playlist cargándose, la cola se volverá a llenar
+            if state['last_channel'] and not state['ingesting']:
                 await state['last_channel'].send(embed=create_success_embed(
                     "Cola finalizada",
                     "✅ Se terminaron las canciones en la cola."
@@ -328,37 +514,56 @@ class Music(commands.Cog):
             return
 
         state['current_song'] = next_song
+        state['resume_attempts'] = 0
+
+        # Video que falló hace poco de forma permanente: saltarlo sin gastar
+        # el límite de fallos. Se saca del historial para que los modos loop
+        # no lo repitan, así que esta recursión siempre termina
+        reason = self.youtube.get_failure(next_song.url)
+        if reason:
+            logger.info(f'⏭️  Skipping unavailable song ({reason}): {next_song.title}')
+            if preloaded_source:
+                preloaded_source.cleanup()
+            state['queue'].forget(next_song)
+            await self._play_next(guild_id)
+            return
 
         try:
-            # Obtener URL de stream
-            stream_url = await self.youtube.get_stream_url(next_song.url)
-
-            if not stream_url:
+            # Fuente ya preparada durante el final de la canción anterior (gapless)
+            audio_source = preloaded_source if preloaded_song is next_song else None
+            if audio_source is None:
+                if preloaded_source:
+                    preloaded_source.cleanup()  # La cola cambió: la preparada ya no toca
+                audio_source = await self._open_source(guild_id, next_song)
+
+            if audio_source is None:
                 logger.warning(f'⚠️  Failed to get stream URL for: {next_song.title}')
+                if self.youtube.get_failure(next_song.url):
+                    # Fallo permanente recién detectado: no es culpa de YouTube/cookies
+                    state['queue'].forget(next_song)
+                    await self._play_next(guild_id)
+                    return
+                if extraction_health.is_open():
+                    # YouTube está limitando: reintentar esta canción cuando pase
+                    # la pausa en vez de vaciar la cola saltando canciones
+                    asyncio.create_task(self._retry_after_cooldown(guild_id, next_song))
+                    return
                 state['consecutive_failures'] += 1
                 # Skip automático a siguiente canción
                 logger.info(f'⏭️  Auto-skipping to next song (failure {state["consecutive_failures"]}/5)')
                 await self._play_next(guild_id)
                 return
 
-            # Crear source de audio
-            audio_source = discord.FFmpegPCMAudio(stream_url, **Settings.FFMPEG_OPTIONS)
-
-            # Ajustar volumen
-            audio_source = discord.PCMVolumeTransformer(audio_source, volume=state['volume'])
-
-            # Reproducir
-            state['voice_client'].play(
-                audio_source,
-                after=lambda e: asyncio.run_coroutine_threadsafe(
-                    self._play_next(guild_id),
-                    self.bot.loop
-                )
-            )
+            # Reproducir (con crossfade, la preparada ya sonó sus primeros segundos)
+            start = preloaded_source.consumed / FRAMES_PER_SECOND if audio_source is preloaded_source else 0
+            self._play_source(guild_id, next_song, audio_source, start=start)
 
             # Reset contador de fallos (reproducción exitosa)
             state['consecutive_failures'] = 0
 
+            # Pre-resolver las siguientes mientras suena esta
+            state['prefetcher'].schedule()
+
             # Enviar mensaje de "Now Playing"
             if state['last_channel']:
                 embed = create_now_playing_embed(
@@ -383,6 +588,238 @@ class Music(commands.Cog):
             logger.info(f'⏭️  Auto-skipping to next song (failure {state["consecutive_failures"]}/5)')
             await self._play_next(guild_id)
 
+    async def _open_source(self, guild_id, song, start: float = 0) -> Optional[discord.AudioSource]:
+        """
+        Crear el source de audio de una canción
+        OPTIMIZADO: caché de audio y stream compartido entre servidores (modo 'opus')
+        antes de recurrir a un pipeline propio de FFmpeg
+
+        Args:
+            start: Segundo desde el que empezar (seek / reanudación)
+
+        Returns:
+            AudioSource o None si no se pudo obtener el stream
+        """
+        state = self.guild_states[guild_id]
+
+        # Modo 'opus': caché de audio para repeticiones y stream compartido entre
+        # servidores que ponen la misma canción (canciones de duración conocida)
+        video_id = self.youtube.extract_video_id(song.url)
+        cache_key = None
+        if (video_id and playback_mode() == PLAYBACK_OPUS
+                and 0 < song.duration <= Settings.FRAME_CACHE_MAX_DURATION):
+            cache_key = frame_cache.make_key(video_id, state['volume'])
+
+        if cache_key:
+            cached_packets = await frame_cache.get(cache_key)
+            if cached_packets:
+                logger.info(f'♻️  Reproduciendo desde el caché de audio: {song.title}')
+                return CachedOpusSource(cached_packets, start)
+
+            # Las emisiones compartidas siempre empiezan desde el principio
+            shared_source = broadcast_hub.join(cache_key) if not start else None
+            if shared_source:
+                return shared_source
+
+        # Obtener URL de stream (reusar la ya resuelta si no ha expirado)
+        if song.has_valid_stream(margin=Settings.STREAM_URL_EXPIRY_MARGIN):
+            stream_url = song.stream_url
+        else:
+            stream_url = await self.youtube.get_stream_url(song.url, guild_id=guild_id)
+            if not stream_url:
+                return None
+            song.set_stream(stream_url, self.youtube.parse_stream_expiry(stream_url))
+
+        # Crear source de audio (Opus sin recodificar cuando se puede)
+        audio_source = create_audio_source(stream_url, state['volume'], start)
+
+        # Emitir para otros servidores que pongan la misma canción y, si suena
+        # entera, contarla; se graba para el caché solo si es probable que se repita
+        if cache_key and not start:
+            recording = frame_cache.begin_recording(
+                cache_key, song.duration, replay_likely=state['queue'].get_loop_mode() == 'song'
+            )
+            audio_source = broadcast_hub.start(
+                cache_key, audio_source, song.duration, record=recording,
+                on_complete=lambda packets, key=cache_key: self.bot.loop.call_soon_threadsafe(
+                    frame_cache.store, key, packets
+                ),
+                on_abort=(lambda key=cache_key: self.bot.loop.call_soon_threadsafe(
+                    frame_cache.end_recording, key
+                )) if recording else None
+            )
+        return audio_source
+
+    def _play_source(self, guild_id, song, source, start: float = 0) -> TrackedSource:
+        """
+        Reproducir un source de la canción actual, o sustituir el que está
+        sonando sin parar el reproductor (seek, cambio de volumen, reanudación)
+
+        Args:
+            start: Segundo de la canción en el que empieza el source
+
+        Returns:
+            TrackedSource: Source que lleva la posición de la canción
+        """
+        state = self.guild_states[guild_id]
+
+        # Contar lo enviado y preparar la siguiente poco antes del final
+        tracked = TrackedSource(
+            source, song.duration,
+            on_near_end=lambda: self.bot.loop.call_soon_threadsafe(
+                lambda: asyncio.create_task(self._preload_next(guild_id))
+            ),
+            lead=max(Settings.GAPLESS_PRELOAD_SECONDS, Settings.CROSSFADE_SECONDS + 2),
+            crossfade=Settings.CROSSFADE_SECONDS,
+            start=start
+        )
+
+        voice_client = state['voice_client']
+        previous, state['tracked'] = state['tracked'], tracked
+        if voice_client.is_playing() or voice_client.is_paused():
+            # Mismo reproductor (y mismo 'after'): el cambio no se oye como un corte.
+            # El source anterior se cierra cuando el reproductor ya lee del nuevo
+            paused = voice_client.is_paused()
+            voice_client.source = tracked
+            if paused:
+                # discord.py reanuda el reproductor al cambiar de source
+                voice_client.pause()
+            if previous:
+                self.bot.loop.call_later(1, previous.cleanup)
+        else:
+            voice_client.play(
+                tracked,
+                after=lambda e: asyncio.run_coroutine_threadsafe(
+                    self._play_next(guild_id),
+                    self.bot.loop
+                )
+            )
+        return tracked
+
+    async def _restart_at(self, guild_id, position: float) -> bool:
+        """
+        Volver a abrir la canción actual desde una posición y cambiar a ella
+
+        Returns:
+            bool: True si se pudo abrir el stream
+        """
+        state = self.guild_states[guild_id]
+        song = state['current_song']
+
+        # La siguiente preparada (y su crossfade) se volverá a preparar desde la nueva posición
+        self._discard_preloaded(state)
+
+        source = await self._open_source(guild_id, song, start=position)
+        voice_client = state['voice_client']
+        if source is None or state['current_song'] is not song or not voice_client:
+            if source:
+                source.cleanup()
+            return False
+
+        self._play_source(guild_id, song, source, start=position)
+        return True
+
+    async def _resume_song(self, guild_id, song, position: float) -> bool:
+        """
+        Reanudar una canción cuyo stream terminó antes de tiempo,
+        con una URL nueva y desde el punto en que se cortó
+
+        Returns:
+            bool: True si se reanudó
+        """
+        state = self.guild_states[guild_id]
+        voice_client = state['voice_client']
+        if not voice_client or not voice_client.is_connected():
+            return False
+
+        logger.warning(f'🔁 Stream cortado en {position:.0f}s, reanudando: {song.title}')
+        # La URL pudo caducar a mitad de canción: pedir una nueva
+        self.youtube.invalidate_stream(song.url)
+        song.set_stream(None, 0)
+
+        source = await self._open_source(guild_id, song, start=position)
+        if source is None or state['current_song'] is not song:
+            if source:
+                source.cleanup()
+            return False
+
+        self._play_source(guild_id, song, source, start=position)
+        return True
+
+    async def _preload_next(self, guild_id):
+        """
+        Preparar la siguiente canción mientras terminan de sonar los últimos
+        segundos de la actual: FFmpeg arrancado y primeros paquetes en buffer,
+        para que _play_next la empiece sin esperas (y, con crossfade, mezclarla)
+        """
+        state = self.guild_states.get(guild_id)
+        if not state or state['preloaded'] or not state['voice_client']:
+            return
+
+        current = state['voice_client'].source
+        upcoming = state['queue'].peek_next(1)
+        if not isinstance(current, TrackedSource) or not upcoming:
+            return
+        song = upcoming[0]
+        if song is state['current_song'] or self.youtube.get_failure(song.url):
+            return  # Loop de canción (la sirve el caché de audio) o canción no disponible
+
+        try:
+            source = await self._open_source(guild_id, song)
+            if source is None:
+                return
+            source = PrimedSource(source)
+            await asyncio.to_thread(source.prime, PRIME_FRAMES)
+        except Exception as e:
+            logger.error(f'Error preparando la siguiente canción: {e}')
+            return
+
+        # La canción actual pudo terminar o cambiar mientras se preparaba
+        if state['voice_client'] is None or state['voice_client'].source is not current:
+            source.cleanup()
+            return
+
+        state['preloaded'] = (song, source)
+        crossfade = current.attach_next(source)
+        logger.debug(f'⏩ Siguiente canción preparada{" (crossfade)" if crossfade else ""}: {song.title}')
+
+    @staticmethod
+    def _discard_preloaded(state) -> None:
+        """Cerrar la siguiente canción preparada (FFmpeg y conexión HTTP) si la hay"""
+        if state['preloaded']:
+            state['preloaded'][1].cleanup()
+            state['preloaded'] = None
+
+    async def _retry_after_cooldown(self, guild_id, song):
+        """
+        Devolver una canción a la cola y reintentar la reproducción
+        cuando termine la pausa impuesta por los límites de YouTube
+        """
+        state = self.guild_states.get(guild_id)
+        if not state:
+            return
+
+        state['queue'].requeue(song)
+        state['current_song'] = None
+        delay = max(1, round(extraction_health.cooldown_remaining()))
+        logger.warning(f'⏳ YouTube limitando peticiones, reintentando "{song.title}" en {delay}s')
+
+        if state['last_channel']:
+            await state['last_channel'].send(embed=create_error_embed(
+                "YouTube está limitando peticiones",
+                f"⏳ Reintentando **{song.title}** en {delay}s..."
+            ))
+
+        await asyncio.sleep(delay)
+
+        # Reanudar solo si nadie ha parado, vaciado o vuelto a reproducir mientras tanto
+        voice_client = state['voice_client']
+        if (not voice_client or not voice_client.is_connected()
+                or voice_client.is_playing() or voice_client.is_paused()
+                or not state['queue'].peek_next(1)):
+            return
+        await self._play_next(guild_id)
+
     @commands.command(name='pause')
     async def pause(self, ctx):
         """Pausar reproducción actual"""
@@ -429,6 +866,8 @@ class Music(commands.Cog):
             return
 
         state['queue'].clear()
+        state['prefetcher'].cancel()
+        state['ingest_generation'] += 1
         state['current_song'] = None
 
         if state['voice_client'].is_playing():
@@ -450,11 +889,75 @@ class Music(commands.Cog):
         state = self.get_guild_state(ctx.guild.id)
         state['volume'] = volume / 100
 
-        if state['voice_client'] and state['voice_client'].source:
-            state['voice_client'].source.volume = state['volume']
+        voice_client = state['voice_client']
+        tracked = state['tracked']
+        playing = voice_client and (voice_client.is_playing() or voice_client.is_paused())
+        if tracked and playing and not set_live_volume(tracked, state['volume']):
+            # Modo 'opus': el volumen lo aplica FFmpeg, reabrir en la posición actual
+            await self._restart_at(ctx.guild.id, tracked.position)
 
         await ctx.send(embed=create_success_embed("Volumen ajustado", f"🔊 Volumen: {volume}%"))
 
+    @commands.command(name='seek')
+    async def seek(self, ctx, position: str):
+        """
+        Saltar a un tiempo específico de la canción actual
+
+        Uso:
+            !seek 1:30
+            !seek 90
+        """
+        state = self.get_guild_state(ctx.guild.id)
+        voice_client = state['voice_client']
+        song = state['current_song']
+
+        if (not song or not state['tracked'] or not voice_client
+                or not (voice_client.is_playing() or voice_client.is_paused())):
+            await ctx.send(embed=create_error_embed("Error", "No hay nada reproduciéndose."))
+            return
+
+        seconds = self._parse_timestamp(position)
+        if seconds is None:
+            await ctx.send(embed=create_error_embed("Error", "Formato inválido. Usa `!seek 1:30` o `!seek 90`."))
+            return
+
+        if not song.duration:
+            await ctx.send(embed=create_error_embed("Error", "No se puede saltar en streams en vivo."))
+            return
+
+        if seconds >= song.duration:
+            await ctx.send(embed=create_error_embed(
+                "Error",
+                f"La canción dura {song.format_duration()}."
+            ))
+            return
+
+        async with ctx.typing():
+            if not await self._restart_at(ctx.guild.id, seconds):
+                await ctx.send(embed=create_error_embed("Error", "No se pudo saltar a ese punto."))
+                return
+
+        await ctx.send(embed=create_success_embed(
+            "Posición cambiada",
+            f"⏩ **{song.title}** desde {self._format_position(seconds)}"
+        ))
+
+    @staticmethod
+    def _parse_timestamp(text: str) -> Optional[int]:
+        """Convertir '90', '1:30' o '1:02:03' a segundos (None si no es válido)"""
+        parts = text.strip().split(':')
+        if not 1 <= len(parts) <= 3 or not all(part.isdigit() for part in parts):
+            return None
+
+        seconds = 0
+        for part in parts:
+            seconds = seconds * 60 + int(part)
+        return seconds
+
+    def _format_position(self, seconds: float) -> str:
+        """Formatear una posición en segundos (0:00 en vez de ??:??)"""
+        return self.youtube.format_duration(int(seconds)) if seconds >= 1 else '0:00'
+
     @commands.command(name='nowplaying', aliases=['np', 'current'])
     async def nowplaying(self, ctx):
         """Mostrar canción actual"""
@@ -469,6 +972,12 @@ class Music(commands.Cog):
             loop_mode=state['queue'].get_loop_mode(),
             volume=int(state['volume'] * 100)
         )
+        if state['tracked']:
+            embed.add_field(
+                name="⏱️ Posición",
+                value=f"{self._format_position(state['tracked'].position)} / {state['current_song'].format_duration()}",
+                inline=True
+            )
         await ctx.send(embed=embed)
 
     @commands.command(name='queue', aliases=['q'])
@@ -509,6 +1018,9 @@ class Music(commands.Cog):
                 ))
                 return
 
+        # La siguiente canción depende del modo de loop
+        state['prefetcher'].invalidate()
+
         mode_text = {
             'off': '➡️ Desactivado',
             'song': '🔂 Canción actual',
@@ -530,6 +1042,7 @@ class Music(commands.Cog):
             return
 
         state['queue'].shuffle()
+        state['prefetcher'].invalidate()
         await ctx.send(embed=create_success_embed("Cola mezclada", "🔀 La cola ha sido mezclada aleatoriamente."))
 
     @commands.command(name='remove', aliases=['rm'])
@@ -543,6 +1056,7 @@ class Music(commands.Cog):
 
         # Convert to 0-based index
         if state['queue'].remove(index - 1):
+            state['prefetcher'].invalidate()
             await ctx.send(embed=create_success_embed("Eliminado", f"🗑️ Canción #{index} eliminada de la cola."))
         else:
             await ctx.send(embed=create_error_embed("Error", "Índice inválido."))
@@ -557,6 +1071,8 @@ class Music(commands.Cog):
             return
 
         state['queue'].clear()
+        state['prefetcher'].cancel()
+        state['ingest_generation'] += 1
         await ctx.send(embed=create_success_embed("Cola limpiada", "🗑️ Se limpiaron todas las canciones de la cola."))
 
     @commands.command(name='jump')
@@ -578,6 +1094,7 @@ class Music(commands.Cog):
 
         # Saltar a la posición
         song = state['queue'].jump_to(position - 1)
+        state['prefetcher'].invalidate()
 
         if song:
             await ctx.send(embed=create_success_embed("Saltando", f"⏩ Saltando a: **{song.title}**"))
@@ -594,6 +1111,7 @@ class Music(commands.Cog):
         state = self.get_guild_state(ctx.guild.id)
 
         if state['queue'].move(from_pos - 1, to_pos - 1):
+            state['prefetcher'].invalidate()
             await ctx.send(embed=create_success_embed(
                 "Movido",
                 f"↕️ Canción movida de posición {from_pos} a {to_pos}."
@@ -8,6 +8,7 @@ import aiosqlite
 import logging
 from typing import List, Dict
 
+from ..utils.song import Song
 from ..utils.embeds import (
     create_favorites_embed,
     create_error_embed,
@@ -234,14 +235,38 @@ class Playlist(commands.Cog):
             await ctx.send(embed=create_error_embed("Error", "Cog de música no encontrado."))
             return
 
-        # Añadir todos los favoritos a la cola
+        if not await music_cog.join_voice_channel(ctx):
+            return
+
+        state = music_cog.get_guild_state(ctx.guild.id)
+        state['last_channel'] = ctx.channel
+
+        # Añadir los favoritos como entradas lazy: sin extraer nada ahora, el
+        # prefetcher y _play_next las resuelven de una en una cuando tocan
+        added_count = 0
+        for fav in favorites:
+            song = Song.from_youtube_info({
+                'title': fav['title'],
+                'url': fav['url'],
+                'thumbnail': fav.get('thumbnail') or '',
+                '_lazy': True
+            }, ctx.author)
+            if music_cog.youtube.get_failure(song.url):
+                continue
+            if not state['queue'].add(song):
+                break  # Cola llena
+            added_count += 1
+
         await ctx.send(embed=create_success_embed(
-            "Añadiendo favoritos",
-            f"🎵 Añadiendo {len(favorites)} canciones a la cola..."
+            "Favoritos añadidos",
+            f"🎵 {added_count} canciones añadidas a la cola."
         ))
 
-        for fav in favorites:
-            await ctx.invoke(self.bot.get_command('play'), query=fav['url'])
+        # Si no hay nada reproduciéndose, empezar
+        if not state['voice_client'].is_playing() and not state['voice_client'].is_paused():
+            await music_cog._play_next(ctx.guild.id)
+        else:
+            state['prefetcher'].invalidate()
 
     @commands.command(name='clearfavorites', aliases=['clearfavs'])
     async def clearfavorites(self, ctx):
@@ -10,6 +10,7 @@ from typing import Optional
 from ..utils.preferences_db import PreferencesDB
 from ..utils.recommendation_engine import RecommendationEngine
 from ..utils.youtube_handler import YouTubeHandler
+from ..utils.extraction_scheduler import PRIORITY_BULK
 from ..utils.song import Song
 from ..utils.embeds import (
     create_success_embed,
@@ -175,12 +176,16 @@ class Radio(commands.Cog):
             # Generar cola de radio
             if genre:
                 # Buscar playlist relacionada con el género
-                playlists = await self.recommendation_engine.find_playlist_by_query(genre, limit=1)
+                playlists = await self.recommendation_engine.find_playlist_by_query(
+                    genre, limit=1, guild_id=ctx.guild.id
+                )
 
                 if playlists:
                     # Obtener canciones de la playlist
                     playlist_url = playlists[0].get('webpage_url') or playlists[0].get('url')
-                    songs_data = await self.youtube.get_playlist(playlist_url, max_songs=20)
+                    songs_data = await self.youtube.get_playlist(
+                        playlist_url, max_songs=20, priority=PRIORITY_BULK, guild_id=ctx.guild.id
+                    )
 
                     # Añadir a la cola
                     for song_data in songs_data:
@@ -188,7 +193,9 @@ class Radio(commands.Cog):
                         state['queue'].add(song)
                 else:
                     # Si no encuentra playlist, buscar canciones individuales
-                    results = await self.youtube.search(f"{genre} music", limit=10)
+                    results = await self.youtube.search(
+                        f"{genre} music", limit=10, priority=PRIORITY_BULK, guild_id=ctx.guild.id
+                    )
                     for result in results:
                         song = Song.from_youtube_info(result, ctx.author)
                         state['queue'].add(song)
@@ -216,6 +223,8 @@ class Radio(commands.Cog):
             # Si no hay nada reproduciéndose, empezar
             if not state['voice_client'].is_playing():
                 await music_cog._play_next(ctx.guild.id)
+            else:
+                state['prefetcher'].invalidate()
 
             embed = create_success_embed(
                 "🎵 Radio Iniciada",
@@ -367,7 +376,9 @@ class Radio(commands.Cog):
         ))
 
         async with ctx.typing():
-            playlists = await self.recommendation_engine.find_playlist_by_query(query, limit=3)
+            playlists = await self.recommendation_engine.find_playlist_by_query(
+                query, limit=3, guild_id=ctx.guild.id
+            )
 
             if not playlists:
                 await ctx.send(embed=create_error_embed(
@@ -19,6 +19,10 @@ class Settings:
     # Spotify Configuration
     SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
     SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
+    SPOTIFY_TIMEOUT = 10  # Timeout por petición a la API de Spotify (segundos)
+    SPOTIFY_MAX_WORKERS = 4  # Llamadas simultáneas a la API de Spotify
+    SPOTIFY_MATCH_CANDIDATES = 5  # Resultados de YouTube puntuados por cada track
+    SPOTIFY_MATCH_MIN_CONFIDENCE = 0.6  # Confianza mínima para guardar el emparejamiento
 
     # Bot Configuration
     DEFAULT_VOLUME = int(os.getenv('DEFAULT_VOLUME', 50))
@@ -42,6 +46,54 @@ class Settings:
         'options': '-vn'
     }
 
+    # Playback Configuration
+    # 'pcm' (default): decodificación a PCM con volumen en Python (cambio de volumen instantáneo, más CPU)
+    # 'opus' (opcional): el audio va a Discord ya en Opus. Passthrough sin recodificar solo si el
+    #         stream es Opus y el volumen es 100%; con otro volumen FFmpeg recodifica con libopus,
+    #         y cada !volume reabre el stream (petición nueva y un pequeño corte)
+    PLAYBACK_MODE = os.getenv('PLAYBACK_MODE', 'pcm')
+    OPUS_BITRATE = 128  # kbps cuando FFmpeg tiene que codificar (volumen distinto de 100% o stream no Opus)
+
+    # Caché de audio Opus (solo modo 'opus'): repeticiones sin yt-dlp ni FFmpeg
+    FRAME_CACHE_MEMORY_MB = int(os.getenv('FRAME_CACHE_MEMORY_MB', 64))
+    FRAME_CACHE_DIR = os.getenv('FRAME_CACHE_DIR', '')  # Vacío = solo memoria
+    FRAME_CACHE_DISK_MB = int(os.getenv('FRAME_CACHE_DISK_MB', 512))
+    FRAME_CACHE_DISK_MIN_PLAYS = 2  # Reproducciones completas para guardar una canción en disco
+    FRAME_CACHE_MAX_DURATION = 900  # No cachear canciones de más de 15 min (mixes, directos)
+    BROADCAST_JOIN_WINDOW = 5  # Segundos en los que otro servidor puede compartir el stream de la misma canción
+    BROADCAST_MAX_LAG = 30  # Segundos de retraso (p. ej. en pausa) tras los que un servidor deja el stream compartido
+
+    # Transiciones sin silencio: la siguiente canción se prepara unos segundos antes del final
+    GAPLESS_PRELOAD_SECONDS = 5
+    CROSSFADE_SECONDS = float(os.getenv('CROSSFADE_SECONDS', 0))  # Mezcla entre canciones (solo modo 'pcm')
+
+    # Stream URL Configuration (en segundos)
+    STREAM_URL_EXPIRY_MARGIN = 300  # Re-resolver si la URL expira en menos de 5 min
+    STREAM_URL_DEFAULT_TTL = 3600  # Si la URL no trae 'expire=', asumir 1 hora
+    PREFETCH_DEPTH = int(os.getenv('PREFETCH_DEPTH', 2))  # Canciones a pre-resolver
+
+    # Cache Configuration
+    VIDEO_CACHE_TTL = int(os.getenv('VIDEO_CACHE_TTL', 3600))  # 1 hora
+    VIDEO_CACHE_MAX_ENTRIES = int(os.getenv('VIDEO_CACHE_MAX_ENTRIES', 500))
+    VIDEO_CACHE_MAX_MB = int(os.getenv('VIDEO_CACHE_MAX_MB', 64))
+    CACHE_SWEEP_INTERVAL = 300  # Limpieza de entradas expiradas cada 5 min
+    SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 6 * 3600))  # 6 horas
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', 1000))
+    SEARCH_CACHE_MAX_MB = int(os.getenv('SEARCH_CACHE_MAX_MB', 16))
+    FAILURE_CACHE_TTL = int(os.getenv('FAILURE_CACHE_TTL', 3600))  # Recordar videos no disponibles 1 hora
+
+    # Caché persistente en disco (vacío = desactivado)
+    PERSISTENT_CACHE_PATH = os.getenv('PERSISTENT_CACHE_PATH', '')
+    PERSISTENT_CACHE_TTL = int(os.getenv('PERSISTENT_CACHE_TTL', 7 * 24 * 3600))  # 7 días
+    PERSISTENT_CACHE_MAX_ENTRIES = int(os.getenv('PERSISTENT_CACHE_MAX_ENTRIES', 20000))
+
+    # Extraction Configuration
+    YTDL_MAX_WORKERS = int(os.getenv('YTDL_MAX_WORKERS', 4))  # Extracciones yt-dlp simultáneas
+    YTDL_BACKEND = os.getenv('YTDL_BACKEND', 'thread')  # 'thread' o 'process' (usa varios núcleos)
+    YTDL_BACKOFF_BASE = 5  # Pausa tras el primer 429/anti-bots (se duplica con cada bloqueo)
+    YTDL_BACKOFF_MAX = 300  # Pausa máxima del trabajo masivo (5 min)
+    YTDL_RESERVED_INTERACTIVE = 1  # Huecos de extracción que prefetch/masivas dejan libres para !play
+
     # Cooldown Configuration (en segundos)
     COMMAND_COOLDOWN = 5
     SEARCH_COOLDOWN = 10
@@ -2,11 +2,13 @@
 Utils package for Discord Music Bot
 """
 from .song import Song
+from .track_info import TrackInfo
 from .queue_manager import QueueManager
 from .youtube_handler import YouTubeHandler
 from .spotify_handler import SpotifyHandler
 from .preferences_db import PreferencesDB
 from .recommendation_engine import RecommendationEngine
+from .prefetcher import StreamPrefetcher
 from .embeds import (
     create_now_playing_embed,
     create_queue_embed,
@@ -17,11 +19,13 @@ from .embeds import (
 
 __all__ = [
     'Song',
+    'TrackInfo',
     'QueueManager',
     'YouTubeHandler',
     'SpotifyHandler',
     'PreferencesDB',
     'RecommendationEngine',
+    'StreamPrefetcher',
     'create_now_playing_embed',
     'create_queue_embed',
     'create_search_results_embed',
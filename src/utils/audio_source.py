@@ -0,0 +1,314 @@
+"""
+Audio Source - Construcción de los sources de audio para el cliente de voz
+En modo 'opus' el audio llega a Discord ya codificado en Opus: si el stream
+de YouTube es Opus (WebM) y el volumen es 100%, FFmpeg solo re-empaqueta los
+paquetes sin decodificar; con otro volumen o códec, FFmpeg aplica el volumen
+con un filtro y codifica a Opus él mismo. En ningún caso Python escala PCM
+ni codifica Opus frame a frame
+"""
+import logging
+from array import array
+from collections import deque
+from typing import Callable, Deque, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+import discord
+
+from ..config.settings import Settings
+
+
+logger = logging.getLogger('MusicBot.Audio')
+
+PLAYBACK_OPUS = 'opus'  # FFmpegOpusAudio (passthrough o codificado por FFmpeg)
+PLAYBACK_PCM = 'pcm'  # FFmpegPCMAudio + PCMVolumeTransformer (volumen en vivo)
+
+# Formato de yt-dlp según el modo: en 'opus' se prefieren los formatos WebM/Opus
+AUDIO_FORMATS = {
+    PLAYBACK_OPUS: 'bestaudio[acodec=opus]/bestaudio/best',
+    PLAYBACK_PCM: 'bestaudio/best',
+}
+
+# discord.py envía un paquete Opus cada 20 ms
+FRAMES_PER_SECOND = 50
+
+# Margen para dar por completa una reproducción (la duración de YouTube va redondeada)
+COMPLETE_TOLERANCE_FRAMES = 2 * FRAMES_PER_SECOND
+
+# Paquetes que se dejan en buffer al preparar la siguiente canción (0,5 s)
+PRIME_FRAMES = 25
+
+# itags de YouTube con audio Opus en WebM (50, 70 y 160 kbps)
+_OPUS_ITAGS = {'249', '250', '251'}
+
+
+def playback_mode() -> str:
+    """
+    Modo de reproducción configurado
+
+    Returns:
+        str: 'opus' o 'pcm' (valores desconocidos cuentan como 'pcm')
+    """
+    mode = (Settings.PLAYBACK_MODE or '').lower()
+    return mode if mode in AUDIO_FORMATS else PLAYBACK_PCM
+
+
+def is_opus_stream(stream_url: str) -> bool:
+    """
+    Verificar si una URL de googlevideo sirve audio Opus
+
+    Se lee de la propia URL (parámetros 'mime' e 'itag'), así que funciona
+    también con URLs sacadas del caché de streams, sin lanzar ffprobe.
+
+    Args:
+        stream_url: URL directa del audio
+
+    Returns:
+        bool: True si el stream es WebM/Opus
+    """
+    params = parse_qs(urlparse(stream_url).query)
+    mime = (params.get('mime') or [''])[0]
+    if mime:
+        return mime == 'audio/webm'
+    return (params.get('itag') or [''])[0] in _OPUS_ITAGS
+
+
+def create_audio_source(stream_url: str, volume: float, start: float = 0) -> discord.AudioSource:
+    """
+    Crear el source de audio de una canción
+
+    Args:
+        stream_url: URL directa del audio
+        volume: Volumen entre 0 y 1
+        start: Segundo desde el que empezar (seek en la entrada de FFmpeg)
+
+    Returns:
+        discord.AudioSource: FFmpegOpusAudio en modo 'opus',
+        PCMVolumeTransformer sobre FFmpegPCMAudio en modo 'pcm'
+    """
+    before_options = Settings.FFMPEG_OPTIONS['before_options']
+    if start > 0:
+        # -ss antes de -i: FFmpeg pide a YouTube el rango desde ese punto, sin descargar lo anterior
+        before_options = f'-ss {start:.2f} {before_options}'
+
+    if playback_mode() == PLAYBACK_PCM:
+        source = discord.FFmpegPCMAudio(
+            stream_url, before_options=before_options, options=Settings.FFMPEG_OPTIONS['options']
+        )
+        return discord.PCMVolumeTransformer(source, volume=volume)
+
+    options = Settings.FFMPEG_OPTIONS['options']
+    codec: Optional[str] = None  # None = libopus dentro de FFmpeg
+    if volume != 1.0:
+        options = f'{options} -af volume={volume:.2f}'
+    elif is_opus_stream(stream_url):
+        # Mismos paquetes Opus que envía YouTube: sin decodificar ni recodificar
+        # (discord.py copia el stream con 'opus'; 'copy' solo lo aceptan versiones recientes)
+        codec = 'opus'
+
+    logger.debug(f'🎧 Source Opus ({"passthrough" if codec else "FFmpeg libopus"})')
+    return discord.FFmpegOpusAudio(
+        stream_url,
+        codec=codec,
+        bitrate=Settings.OPUS_BITRATE,
+        before_options=before_options,
+        options=options
+    )
+
+
+def set_live_volume(source: Optional[discord.AudioSource], volume: float) -> bool:
+    """
+    Cambiar el volumen de un source sin reiniciarlo
+
+    Args:
+        source: Source que está sonando (puede estar envuelto en TrackedSource/PrimedSource)
+        volume: Volumen entre 0 y 1
+
+    Returns:
+        bool: True si se pudo (solo PCMVolumeTransformer, modo 'pcm')
+    """
+    while source is not None and not isinstance(source, discord.PCMVolumeTransformer):
+        source = getattr(source, 'original', None)
+    if source is None:
+        return False
+    source.volume = volume
+    return True
+
+
+class CachedOpusSource(discord.AudioSource):
+    """Source que reproduce paquetes Opus ya guardados, sin red ni FFmpeg"""
+
+    def __init__(self, packets: Sequence[bytes], start: float = 0):
+        """
+        Args:
+            packets: Paquetes Opus de 20 ms
+            start: Segundo desde el que empezar
+        """
+        self._packets = packets
+        self._index = int(start * FRAMES_PER_SECOND)
+
+    def read(self) -> bytes:
+        if self._index >= len(self._packets):
+            return b''
+        packet = self._packets[self._index]
+        self._index += 1
+        return packet
+
+    def is_opus(self) -> bool:
+        return True
+
+
+class PrimedSource(discord.AudioSource):
+    """
+    Source con los primeros paquetes ya leídos: FFmpeg arrancado, conexión
+    HTTP abierta y audio en buffer, listo para sonar sin esperas
+    """
+
+    def __init__(self, source: discord.AudioSource):
+        """
+        Args:
+            source: Source recién creado (aún sin leer)
+        """
+        self.original = source
+        self._buffer: Deque[bytes] = deque()
+        self.consumed = 0  # Paquetes ya entregados (p. ej. durante un crossfade)
+
+    def prime(self, frames: int) -> None:
+        """
+        Leer por adelantado los primeros paquetes (bloquea: llamar en un hilo)
+
+        Args:
+            frames: Número de paquetes a dejar en buffer
+        """
+        for _ in range(frames):
+            packet = self.original.read()
+            self._buffer.append(packet)
+            if not packet:
+                break
+
+    def read(self) -> bytes:
+        packet = self._buffer.popleft() if self._buffer else self.original.read()
+        if packet:
+            self.consumed += 1
+        return packet
+
+    def is_opus(self) -> bool:
+        return self.original.is_opus()
+
+    def cleanup(self) -> None:
+        self.original.cleanup()
+
+
+class TrackedSource(discord.AudioSource):
+    """
+    Source que cuenta los paquetes enviados de la canción que suena.
+
+    - Lleva la posición dentro de la canción (seek y reanudación).
+    - Distingue un final natural de un stream que se corta antes de tiempo.
+    - Avisa una vez (on_near_end) cuando faltan `lead` segundos para el
+      final, para preparar la siguiente canción.
+    - Con crossfade, mezcla en los últimos segundos el principio de la
+      siguiente canción (solo PCM: los paquetes Opus no se pueden mezclar).
+    read() se ejecuta en el hilo del reproductor de discord.py.
+    """
+
+    def __init__(self, source: discord.AudioSource, duration: int,
+                 on_near_end: Optional[Callable[[], None]] = None, lead: float = 5,
+                 crossfade: float = 0, start: float = 0):
+        """
+        Envolver el source de una canción.
+
+        Args:
+            source: Source de la canción
+            duration: Duración de la canción en segundos (0 = desconocida, sin avisos)
+            on_near_end: Función a llamar cuando falten `lead` segundos
+            lead: Antelación del aviso en segundos
+            crossfade: Segundos de mezcla con la siguiente canción (0 = sin mezcla)
+            start: Segundo de la canción en el que empieza el source
+        """
+        self.original = source
+        self._on_near_end = on_near_end if duration > 0 else None
+        self._expected_frames = duration * FRAMES_PER_SECOND
+        self._near_end_frame = max(0, self._expected_frames - int(lead * FRAMES_PER_SECOND))
+        self._fade_frames = int(crossfade * FRAMES_PER_SECOND) if duration > 0 else 0
+        self._next: Optional[discord.AudioSource] = None
+        self.duration = duration
+        self.frames = int(start * FRAMES_PER_SECOND)  # Posición en paquetes desde el inicio de la canción
+        self.finished = False  # True si el source llegó a su final (no se paró ni se cambió)
+
+    @property
+    def position(self) -> float:
+        """Segundo de la canción que está sonando"""
+        return self.frames / FRAMES_PER_SECOND
+
+    def ended_early(self, tolerance: float = 10) -> bool:
+        """
+        Verificar si el stream terminó antes de lo que dura la canción
+        (URL caducada, corte de red...)
+
+        Args:
+            tolerance: Segundos de margen antes del final
+
+        Returns:
+            bool: True si terminó solo y le faltaban más de `tolerance` segundos
+        """
+        return self.finished and self.duration > 0 and self.position < self.duration - tolerance
+
+    def attach_next(self, source: discord.AudioSource) -> bool:
+        """
+        Entregar el source (ya preparado) de la siguiente canción para el crossfade.
+
+        Args:
+            source: Source PCM de la siguiente canción
+
+        Returns:
+            bool: True si se hará crossfade (ambos PCM y crossfade activo)
+        """
+        if not self._fade_frames or self.original.is_opus() or source.is_opus():
+            return False
+        self._next = source
+        return True
+
+    def read(self) -> bytes:
+        packet = self.original.read()
+        if not packet:
+            self.finished = True
+            return packet
+
+        self.frames += 1
+        if self._on_near_end and self.frames >= self._near_end_frame:
+            callback, self._on_near_end = self._on_near_end, None
+            callback()
+
+        fade_start = self._expected_frames - self._fade_frames
+        if self._next is not None and self.frames > fade_start:
+            progress = min(1.0, (self.frames - fade_start) / self._fade_frames)
+            packet = _crossfade(packet, self._next.read(), progress)
+        return packet
+
+    def is_opus(self) -> bool:
+        return self.original.is_opus()
+
+    def cleanup(self) -> None:
+        # El source de la siguiente canción es de _play_next, no se cierra aquí
+        self.original.cleanup()
+
+
+def _crossfade(outgoing: bytes, incoming: bytes, progress: float) -> bytes:
+    """
+    Mezclar dos paquetes PCM s16le (20 ms, estéreo) para el crossfade
+
+    Las ganancias suman 1, así que la mezcla nunca se sale del rango de 16 bits.
+
+    Args:
+        outgoing: Paquete de la canción que termina
+        incoming: Paquete de la siguiente canción (b'' si aún no hay)
+        progress: Avance del crossfade entre 0 y 1
+
+    Returns:
+        bytes: Paquete mezclado, del tamaño de `outgoing`
+    """
+    samples = array('h', outgoing)
+    other = array('h', incoming[:len(outgoing)])
+    other.extend([0] * (len(samples) - len(other)))  # Silencio si la siguiente trae menos
+    fade_out = 1.0 - progress
+    return array('h', [int(a * fade_out + b * progress) for a, b in zip(samples, other)]).tobytes()
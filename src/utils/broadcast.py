@@ -0,0 +1,343 @@
+"""
+Broadcast - Reparto de un mismo stream Opus entre varios servidores
+Cuando varios servidores ponen la misma canción a la vez (radio del mismo
+género, éxitos del momento), un solo FFmpeg y una sola descarga alimentan a
+todos: los paquetes se leen una vez y cada cliente de voz los consume a su
+ritmo. Quien llega fuera de la ventana de unión usa su propio pipeline
+"""
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import discord
+
+from .audio_source import FRAMES_PER_SECOND, COMPLETE_TOLERANCE_FRAMES
+from ..config.settings import Settings
+
+
+logger = logging.getLogger('MusicBot.Broadcast')
+
+
+class Broadcast:
+    """
+    Un stream Opus compartido.
+
+    Cada oyente avanza con su propio índice (pausas incluidas). Mientras
+    está abierta la ventana de unión se conservan todos los paquetes
+    leídos para que quien llega empiece desde el principio; después solo
+    se guardan los que algún oyente aún no ha leído. Un oyente que se
+    queda más de `max_lag_frames` por detrás (p. ej. en pausa) se
+    desconecta para no retener paquetes de los demás. La canción entera
+    solo se guarda si se graba para el caché de audio.
+
+    Lo usan los hilos de reproducción de discord.py: el lock solo protege
+    el buffer. La lectura del stream original (bloqueante, pipe de FFmpeg)
+    la hace un oyente cada vez fuera del lock, así que un stream atascado no
+    bloquea a los oyentes que van por detrás ni el cierre de la emisión.
+    """
+
+    def __init__(self, key: str, upstream: discord.AudioSource, duration: int,
+                 window_frames: int = 0, max_lag_frames: int = 0, record: bool = False,
+                 on_complete: Optional[Callable[[Optional[List[bytes]]], None]] = None,
+                 on_close: Optional[Callable[['Broadcast'], None]] = None):
+        """
+        Crear una emisión.
+
+        Args:
+            key: Clave (video, volumen)
+            upstream: Source Opus del que se leen los paquetes (FFmpegOpusAudio)
+            duration: Duración de la canción en segundos
+            window_frames: Paquetes emitidos a partir de los que ya no se admiten oyentes
+            max_lag_frames: Retraso máximo de un oyente respecto al stream (0 = sin límite)
+            record: Entregar los paquetes a on_complete para el caché de audio
+            on_complete: Se llama si el stream llega entero al final, con todos
+                los paquetes si se grababa (None si no)
+            on_close: Se llama cuando el último oyente se va
+        """
+        self.key = key
+        self._upstream = upstream
+        self._expected_frames = duration * FRAMES_PER_SECOND
+        self._window_frames = window_frames
+        self._max_lag_frames = max_lag_frames
+        self.detached = 0  # Oyentes desconectados por retraso
+        self._on_complete = on_complete
+        self._on_close = on_close
+
+        self._buffer: Deque[bytes] = deque()  # Paquetes desde el índice _base aún por leer
+        self._base = 0
+        self._read = 0  # Paquetes leídos del stream original
+        self._recording: Optional[List[bytes]] = [] if record else None
+        self._sources: List['BroadcastSource'] = []
+        self._lock = threading.Condition()
+        self._reading = False  # Un oyente está leyendo del stream original
+        self._ended = False
+        self._closed = False
+        self.complete = False  # True si el stream llegó entero al final
+
+    @property
+    def listeners(self) -> int:
+        """Oyentes conectados ahora mismo"""
+        return len(self._sources)
+
+    @property
+    def position(self) -> int:
+        """Paquetes leídos del stream original"""
+        return self._read
+
+    @property
+    def buffered(self) -> int:
+        """Paquetes en memoria para los oyentes"""
+        return len(self._buffer)
+
+    def subscribe(self) -> Optional['BroadcastSource']:
+        """
+        Añadir un oyente que empieza desde el primer paquete
+
+        Returns:
+            BroadcastSource, o None si la emisión terminó o pasó la ventana
+        """
+        with self._lock:
+            if self._ended or self._closed or self._read > self._window_frames:
+                return None
+            source = BroadcastSource(self)
+            self._sources.append(source)
+        return source
+
+    def packet(self, index: int) -> bytes:
+        """
+        Paquete número `index`, leyendo del stream original si aún no se tiene
+
+        Args:
+            index: Posición del oyente
+
+        Returns:
+            bytes: Paquete Opus, o b'' al final del stream
+        """
+        with self._lock:
+            while True:
+                self._trim()
+                if index < self._read:
+                    return self._buffer[index - self._base]
+                if self._ended or self._closed:
+                    return b''
+                if not self._reading:
+                    self._reading = True
+                    break
+                # Otro oyente está leyendo este mismo paquete: esperar sin bloquear el lock
+                self._lock.wait(0.1)
+
+        try:
+            packet = self._upstream.read()
+        except BaseException:
+            with self._lock:
+                self._reading = False
+                self._lock.notify_all()
+            raise
+
+        # Guardar el paquete y ceder la lectura en el mismo paso, para que el
+        # siguiente lector no pueda adelantarlo
+        with self._lock:
+            self._reading = False
+            self._lock.notify_all()
+            if self._closed:
+                return b''
+            if packet:
+                self._read += 1
+                self._buffer.append(packet)
+                if self._recording is not None:
+                    self._recording.append(packet)
+                return packet
+
+            self._ended = True
+            self.complete = self._read >= self._expected_frames - COMPLETE_TOLERANCE_FRAMES
+            recording, self._recording = self._recording, None
+
+        if self.complete and self._on_complete:
+            self._on_complete(recording)
+        return b''
+
+    def _trim(self) -> None:
+        """Pasada la ventana de unión, soltar los paquetes que ya leyeron todos los oyentes"""
+        if self._read <= self._window_frames or not self._sources:
+            return
+
+        if self._max_lag_frames:
+            limit = self._read - self._max_lag_frames
+            lagging = [source for source in self._sources if source.index < limit]
+            # Nunca todos: alguien tiene que seguir leyendo (y cerrar FFmpeg al irse)
+            if lagging and len(lagging) < len(self._sources):
+                for source in lagging:
+                    self._sources.remove(source)
+                    source.detached = True
+                self.detached += len(lagging)
+                logger.info(f'📡 {len(lagging)} oyente(s) de {self.key} muy retrasados, pasan a su propio stream')
+
+        floor = min(source.index for source in self._sources)
+        while self._base < floor:
+            self._buffer.popleft()
+            self._base += 1
+
+    def unsubscribe(self, source: 'BroadcastSource') -> None:
+        """Quitar un oyente; con el último se cierra FFmpeg"""
+        with self._lock:
+            if source not in self._sources:
+                return  # Ya desconectado por retraso
+            self._sources.remove(source)
+            if self._sources or self._closed:
+                return
+            self._closed = True
+            self._buffer.clear()
+            self._recording = None
+
+        self._upstream.cleanup()
+        if self._on_close:
+            self._on_close(self)
+
+
+class BroadcastSource(discord.AudioSource):
+    """
+    Oyente de una emisión: el source que recibe cada cliente de voz.
+
+    Si la emisión lo desconecta por retraso, termina como un stream cortado:
+    el reproductor lo reanuda en esa posición con un pipeline propio.
+    """
+
+    def __init__(self, broadcast: Broadcast):
+        self._broadcast = broadcast
+        self.index = 0
+        self.detached = False
+        self._done = False
+
+    def read(self) -> bytes:
+        if self.detached:
+            return b''
+        packet = self._broadcast.packet(self.index)
+        if packet:
+            self.index += 1
+        return packet
+
+    def is_opus(self) -> bool:
+        return True
+
+    def cleanup(self) -> None:
+        if not self._done:
+            self._done = True
+            self._broadcast.unsubscribe(self)
+
+
+class BroadcastHub:
+    """
+    Registro de emisiones activas por clave (video, volumen).
+
+    - start(): el primer servidor crea la emisión con su propio FFmpeg.
+    - join(): los siguientes se unen si la emisión empezó hace menos de
+      `join_window` segundos; si no, devuelve None y el servidor usa su
+      propio pipeline.
+    """
+
+    def __init__(self, join_window: float = 5, max_lag: float = 30):
+        """
+        Inicializar el hub.
+
+        Args:
+            join_window: Segundos de emisión durante los que se admiten oyentes nuevos
+            max_lag: Segundos de retraso tras los que un oyente deja la emisión
+        """
+        self._window_frames = int(join_window * FRAMES_PER_SECOND)
+        self._max_lag_frames = int(max_lag * FRAMES_PER_SECOND)
+        self._broadcasts: Dict[str, Broadcast] = {}
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._started = 0
+        self._joined = 0
+        self._late = 0
+        self._detached = 0  # Oyentes desconectados por retraso en emisiones ya cerradas
+
+    def join(self, key: str) -> Optional[BroadcastSource]:
+        """
+        Unirse a una emisión en curso de la misma canción.
+
+        Args:
+            key: Clave (video, volumen)
+
+        Returns:
+            BroadcastSource, o None si no hay emisión o ya pasó la ventana
+        """
+        with self._lock:
+            broadcast = self._broadcasts.get(key)
+            if broadcast is None:
+                return None
+            source = broadcast.subscribe()
+            if source is None:
+                self._late += 1
+                return None
+            self._joined += 1
+
+        logger.info(f'📡 Compartiendo stream {key} ({broadcast.listeners} oyentes)')
+        return source
+
+    def start(self, key: str, upstream: discord.AudioSource, duration: int, record: bool = False,
+              on_complete: Optional[Callable[[Optional[List[bytes]]], None]] = None,
+              on_abort: Optional[Callable[[], None]] = None) -> BroadcastSource:
+        """
+        Crear una emisión y devolver el source de su primer oyente.
+
+        Args:
+            key: Clave (video, volumen)
+            upstream: Source Opus recién creado
+            duration: Duración de la canción en segundos
+            record: Grabar la canción entera para el caché de audio
+            on_complete: Se llama si la canción se emite entera (con los paquetes si se grababa)
+            on_abort: Se llama si la emisión se cierra sin llegar entera al final
+
+        Returns:
+            BroadcastSource del servidor que la inicia
+        """
+        def closed(broadcast: Broadcast) -> None:
+            self._remove(broadcast)
+            if on_abort and not broadcast.complete:
+                on_abort()
+
+        broadcast = Broadcast(
+            key, upstream, duration, self._window_frames, self._max_lag_frames,
+            record, on_complete, on_close=closed
+        )
+        with self._lock:
+            # Una emisión anterior ya cerrada a la ventana sigue para sus oyentes
+            self._broadcasts[key] = broadcast
+            self._started += 1
+        return broadcast.subscribe()
+
+    def _remove(self, broadcast: Broadcast) -> None:
+        """Olvidar una emisión sin oyentes"""
+        with self._lock:
+            self._detached += broadcast.detached
+            if self._broadcasts.get(broadcast.key) is broadcast:
+                del self._broadcasts[broadcast.key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtener estadísticas del hub.
+
+        Returns:
+            Dict con emisiones activas, oyentes, paquetes en buffer,
+            emisiones creadas, uniones compartidas, uniones fuera de ventana
+            y oyentes desconectados por retraso
+        """
+        with self._lock:
+            broadcasts = list(self._broadcasts.values())
+        return {
+            'active': len(broadcasts),
+            'listeners': sum(broadcast.listeners for broadcast in broadcasts),
+            'buffered': sum(broadcast.buffered for broadcast in broadcasts),
+            'started': self._started,
+            'joined': self._joined,
+            'late': self._late,
+            'detached': self._detached + sum(broadcast.detached for broadcast in broadcasts)
+        }
+
+
+# Instancia global compartida por todos los servidores
+broadcast_hub = BroadcastHub(join_window=Settings.BROADCAST_JOIN_WINDOW, max_lag=Settings.BROADCAST_MAX_LAG)
@@ -3,79 +3,157 @@ Cache Manager - Sistema de caché en memoria para información de videos
 Reduce dramáticamente el tiempo de carga al reusar datos ya obtenidos
 """
 import asyncio
+import re
+import sys
 import time
-from typing import Dict, Optional, Any
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 import logging
 
+from .track_info import TrackInfo
+from .persistent_cache import PersistentCache, persistent_cache
+from ..config.settings import Settings
+
 
 logger = logging.getLogger('MusicBot.Cache')
 
+# Las URLs de googlevideo llevan la expiración como '?expire=...' o '/expire/.../'
+_EXPIRE_RE = re.compile(r'[?&/]expire[=/](\d+)')
+
+
+def parse_stream_expiry(stream_url: str, default_ttl: int = Settings.STREAM_URL_DEFAULT_TTL) -> float:
+    """
+    Leer la expiración real de una URL de stream de googlevideo
+
+    Args:
+        stream_url: URL directa del audio
+        default_ttl: Segundos a asumir si la URL no trae 'expire'
+
+    Returns:
+        float: Timestamp UNIX de expiración
+    """
+    match = _EXPIRE_RE.search(stream_url)
+    if match:
+        return float(match.group(1))
+    return time.time() + default_ttl
+
 
 class VideoCache:
     """
-    Caché en memoria para información de videos de YouTube.
+    Caché LRU en memoria para información de videos de YouTube.
 
     Evita llamadas repetidas a yt-dlp para el mismo video,
     reduciendo significativamente el tiempo de respuesta.
+    Limitado por número de entradas y por tamaño aproximado en bytes;
+    al superar cualquiera de los dos se expulsan las menos usadas.
+
+    Las lecturas no toman ningún lock: todas las operaciones corren en el
+    event loop y ninguna cede el control a mitad de camino. La coordinación
+    por clave entre extracciones concurrentes la hace el single-flight de
+    YouTubeHandler.
+
+    Opcionalmente tiene un segundo nivel persistente en disco: los TrackInfo
+    se escriben también allí y, ante un fallo en memoria, se busca en disco
+    y se recarga en memoria.
     """
 
-    def __init__(self, ttl: int = 3600):
+    def __init__(self, ttl: int = 3600, max_entries: int = 500, max_bytes: int = 64 * 1024 * 1024,
+                 persistent: Optional[PersistentCache] = None):
         """
         Inicializar el caché.
 
         Args:
             ttl: Tiempo de vida en segundos (default: 1 hora)
+            max_entries: Número máximo de entradas (default: 500)
+            max_bytes: Tamaño aproximado máximo en bytes (default: 64 MB)
+            persistent: Segundo nivel en disco para TrackInfo (opcional)
         """
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._persistent = persistent
         self._ttl = ttl
-        self._lock = asyncio.Lock()
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+        # Métricas
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
 
-    async def get(self, key: str) -> Optional[Dict]:
+    async def get(self, key: str) -> Optional[Union[TrackInfo, List[Dict[str, Any]]]]:
         """
         Obtener un valor del caché.
 
         Args:
-            key: Clave (URL del video)
+            key: Clave (ID del video, o URL si no tiene ID)
 
         Returns:
-            Dict con la información del video o None si no existe/expiró
+            TrackInfo del video (lista de entradas en el caché de búsquedas)
+            o None si no existe/expiró
         """
-        async with self._lock:
-            if key not in self._cache:
-                return None
-
-            entry = self._cache[key]
+        entry = self._cache.get(key)
+        if entry is None:
+            self._misses += 1
+            return await self._load_persistent(key)
 
-            # Verificar si expiró
-            if time.time() - entry['timestamp'] > self._ttl:
-                del self._cache[key]
-                logger.debug(f'Cache expired for: {key[:50]}...')
-                return None
+        # Verificar si expiró
+        if time.time() - entry['timestamp'] > self._ttl:
+            self._discard(key)
+            self._expirations += 1
+            self._misses += 1
+            logger.debug(f'Cache expired for: {key[:50]}...')
+            return await self._load_persistent(key)
 
-            logger.debug(f'✅ Cache HIT for: {key[:50]}...')
-            return entry['data']
+        self._cache.move_to_end(key)
+        self._hits += 1
+        logger.debug(f'✅ Cache HIT for: {key[:50]}...')
+        return entry['data']
 
-    async def set(self, key: str, value: Dict) -> None:
+    async def set(self, key: str, value: Any) -> None:
         """
         Guardar un valor en el caché.
 
         Args:
-            key: Clave (URL del video)
+            key: Clave (ID del video, o URL si no tiene ID)
             value: Información del video
         """
-        async with self._lock:
-            self._cache[key] = {
-                'data': value,
-                'timestamp': time.time()
-            }
-            logger.debug(f'💾 Cache SET for: {key[:50]}...')
+        if self._persistent and isinstance(value, TrackInfo):
+            self._persistent.set_track(value)
+
+        self._store(key, value)
+
+    def _store(self, key: str, value: Any) -> None:
+        """Guardar en memoria aplicando los límites LRU"""
+        size = _estimate_size(value)
+        if size > self._max_bytes:
+            logger.debug(f'Cache SKIP (entrada de {size} bytes) for: {key[:50]}...')
+            return
+
+        if key in self._cache:
+            self._discard(key)
+
+        self._cache[key] = {
+            'data': value,
+            'timestamp': time.time(),
+            'size': size
+        }
+        self._bytes += size
+        logger.debug(f'💾 Cache SET for: {key[:50]}...')
+
+        # Expulsar las entradas menos usadas hasta volver a los límites
+        while self._cache and (len(self._cache) > self._max_entries or self._bytes > self._max_bytes):
+            oldest = next(iter(self._cache))
+            self._discard(oldest)
+            self._evictions += 1
 
     async def clear(self) -> None:
         """Limpiar todo el caché."""
-        async with self._lock:
-            count = len(self._cache)
-            self._cache.clear()
-            logger.info(f'🗑️  Cache cleared ({count} entries removed)')
+        count = len(self._cache)
+        self._cache.clear()
+        self._bytes = 0
+        logger.info(f'🗑️  Cache cleared ({count} entries removed)')
 
     async def remove(self, key: str) -> None:
         """
@@ -84,38 +162,338 @@ class VideoCache:
         Args:
             key: Clave a remover
         """
-        async with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                logger.debug(f'🗑️  Cache entry removed: {key[:50]}...')
+        if key in self._cache:
+            self._discard(key)
+            logger.debug(f'🗑️  Cache entry removed: {key[:50]}...')
 
     async def cleanup_expired(self) -> None:
         """Limpiar entradas expiradas del caché."""
-        async with self._lock:
-            now = time.time()
-            expired_keys = [
-                key for key, entry in self._cache.items()
-                if now - entry['timestamp'] > self._ttl
-            ]
+        now = time.time()
+        expired_keys = [
+            key for key, entry in self._cache.items()
+            if now - entry['timestamp'] > self._ttl
+        ]
 
-            for key in expired_keys:
-                del self._cache[key]
+        for key in expired_keys:
+            self._discard(key)
 
-            if expired_keys:
-                logger.info(f'🗑️  Cleaned {len(expired_keys)} expired cache entries')
+        self._expirations += len(expired_keys)
+
+        if expired_keys:
+            logger.info(f'🗑️  Cleaned {len(expired_keys)} expired cache entries')
+
+    def start_sweeper(self, interval: int = 300) -> None:
+        """
+        Lanzar la limpieza periódica de entradas expiradas en segundo plano.
+
+        Args:
+            interval: Segundos entre limpiezas (default: 5 minutos)
+        """
+        if self._sweeper and not self._sweeper.done():
+            return
+        self._sweeper = asyncio.create_task(_sweep_loop(self.cleanup_expired, interval))
+
+    async def _load_persistent(self, key: str) -> Optional[TrackInfo]:
+        """Buscar en el nivel persistente y recargar la memoria si hay acierto"""
+        if not self._persistent:
+            return None
+
+        track = await self._persistent.get_track(key)
+        if track:
+            self._store(key, track)
+            logger.debug(f'💿 Persistent cache HIT for: {key[:50]}...')
+        return track
+
+    def _discard(self, key: str) -> None:
+        """Eliminar una entrada actualizando el contador de bytes"""
+        entry = self._cache.pop(key, None)
+        if entry:
+            self._bytes -= entry['size']
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtener estadísticas del caché.
+
+        Returns:
+            Dict con número de entradas, tamaño estimado y contadores de aciertos
+        """
+        lookups = self._hits + self._misses
+        return {
+            'entries': len(self._cache),
+            'max_entries': self._max_entries,
+            'bytes': self._bytes,
+            'max_bytes': self._max_bytes,
+            'ttl': self._ttl,
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'expirations': self._expirations,
+            'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0
+        }
+
+
+def _estimate_size(value: Any) -> int:
+    """
+    Estimar el tamaño en memoria de un valor (dicts/listas anidados)
+
+    Args:
+        value: Valor a medir
+
+    Returns:
+        int: Tamaño aproximado en bytes
+    """
+    seen = set()
+    stack = [value]
+    total = 0
+
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+
+    return total
+
+
+class StreamURLCache:
+    """
+    Caché de URLs de stream de audio indexada por ID de video.
+
+    Cada entrada vive hasta poco antes de la expiración real de su URL
+    (parámetro 'expire' de googlevideo), así que los loops y las canciones
+    repetidas no vuelven a pasar por yt-dlp mientras la URL sea válida.
+    """
+
+    def __init__(self, margin: int = 300, max_entries: int = 2000):
+        """
+        Inicializar el caché.
+
+        Args:
+            margin: Segundos antes de la expiración en que se descarta la URL
+            max_entries: Número máximo de URLs guardadas
+        """
+        self._cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._margin = margin
+        self._max_entries = max_entries
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def get(self, video_id: str) -> Optional[str]:
+        """
+        Obtener la URL de stream de un video si sigue siendo válida.
+
+        Args:
+            video_id: ID canónico del video de YouTube
+
+        Returns:
+            str con la URL de stream o None si no existe/va a expirar
+        """
+        entry = self._cache.get(video_id)
+        if not entry:
+            return None
+
+        if time.time() >= entry['expires'] - self._margin:
+            del self._cache[video_id]
+            logger.debug(f'Stream URL expired for: {video_id}')
+            return None
+
+        self._cache.move_to_end(video_id)
+        logger.debug(f'✅ Stream URL HIT for: {video_id}')
+        return entry['url']
+
+    def set(self, video_id: str, stream_url: str, expires: Optional[float] = None) -> None:
+        """
+        Guardar la URL de stream de un video.
+
+        Args:
+            video_id: ID canónico del video de YouTube
+            stream_url: URL directa del audio
+            expires: Timestamp de expiración (se lee de la URL si no se indica)
+        """
+        if not video_id or not stream_url:
+            return
+
+        self._cache[video_id] = {
+            'url': stream_url,
+            'expires': expires or parse_stream_expiry(stream_url)
+        }
+        self._cache.move_to_end(video_id)
+
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+    def remove(self, video_id: str) -> None:
+        """
+        Descartar la URL de un video (p. ej. si FFmpeg recibió un 403).
+
+        Args:
+            video_id: ID canónico del video
+        """
+        self._cache.pop(video_id, None)
+
+    def cleanup_expired(self) -> None:
+        """Limpiar URLs expiradas o a punto de expirar."""
+        limit = time.time() + self._margin
+        expired_keys = [
+            key for key, entry in self._cache.items()
+            if entry['expires'] <= limit
+        ]
+
+        for key in expired_keys:
+            del self._cache[key]
+
+        if expired_keys:
+            logger.info(f'🗑️  Cleaned {len(expired_keys)} expired stream URLs')
+
+    def start_sweeper(self, interval: int = 300) -> None:
+        """
+        Lanzar la limpieza periódica de URLs expiradas en segundo plano.
+
+        Args:
+            interval: Segundos entre limpiezas (default: 5 minutos)
+        """
+        if self._sweeper and not self._sweeper.done():
+            return
+
+        async def cleanup() -> None:
+            self.cleanup_expired()
+
+        self._sweeper = asyncio.create_task(_sweep_loop(cleanup, interval))
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Obtener estadísticas del caché.
+
+        Returns:
+            Dict con número de entradas y margen de expiración
+        """
+        return {
+            'entries': len(self._cache),
+            'margin': self._margin
+        }
+
+
+class FailureCache:
+    """
+    Caché negativo de videos que no se pueden reproducir.
+
+    Guarda, por ID de video, el motivo de un fallo permanente (privado,
+    eliminado, bloqueado en la región...) durante un TTL corto, para no
+    repetir extracciones que van a fallar igual: la misma canción en una
+    cola en bucle, o pedida de nuevo en otro servidor.
+    Los fallos transitorios (red, 429) no se guardan aquí.
+    """
+
+    def __init__(self, ttl: int = 3600, max_entries: int = 2000):
+        """
+        Inicializar el caché.
+
+        Args:
+            ttl: Segundos que se recuerda un fallo (default: 1 hora)
+            max_entries: Número máximo de videos recordados
+        """
+        self._cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._ttl = ttl
+        self._max_entries = max_entries
+
+        # Métricas
+        self._hits = 0
+
+    def get(self, video_id: Optional[str]) -> Optional[str]:
+        """
+        Obtener el motivo por el que un video no se puede reproducir.
+
+        Args:
+            video_id: ID canónico del video de YouTube
+
+        Returns:
+            str con el motivo del fallo o None si no hay fallo reciente
+        """
+        entry = self._cache.get(video_id) if video_id else None
+        if not entry:
+            return None
+
+        if time.time() - entry['timestamp'] > self._ttl:
+            del self._cache[video_id]
+            return None
+
+        self._hits += 1
+        return entry['reason']
+
+    def set(self, video_id: Optional[str], reason: str) -> None:
+        """
+        Recordar que un video falló de forma permanente.
+
+        Args:
+            video_id: ID canónico del video de YouTube
+            reason: Motivo del fallo (ver ytdl_worker.classify_error)
+        """
+        if not video_id:
+            return
+
+        self._cache[video_id] = {'reason': reason, 'timestamp': time.time()}
+        self._cache.move_to_end(video_id)
+        logger.info(f'🚫 Video no disponible ({reason}): {video_id}')
+
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+    def remove(self, video_id: str) -> None:
+        """
+        Olvidar el fallo de un video.
+
+        Args:
+            video_id: ID canónico del video
+        """
+        self._cache.pop(video_id, None)
 
     def get_stats(self) -> Dict[str, int]:
         """
         Obtener estadísticas del caché.
 
         Returns:
-            Dict con número de entradas y tamaño estimado
+            Dict con número de entradas, TTL y extracciones evitadas
         """
         return {
             'entries': len(self._cache),
-            'ttl': self._ttl
+            'ttl': self._ttl,
+            'hits': self._hits
         }
 
 
+async def _sweep_loop(cleanup: Callable[[], Awaitable[None]], interval: int) -> None:
+    """Bucle de limpieza periódica de un caché"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await cleanup()
+        except Exception as e:
+            logger.error(f'Error limpiando caché: {e}')
+
+
 # Instancia global del caché
-video_cache = VideoCache(ttl=3600)  # 1 hora de TTL
+video_cache = VideoCache(
+    ttl=Settings.VIDEO_CACHE_TTL,
+    max_entries=Settings.VIDEO_CACHE_MAX_ENTRIES,
+    max_bytes=Settings.VIDEO_CACHE_MAX_MB * 1024 * 1024,
+    persistent=persistent_cache
+)
+
+# Instancia global del caché de búsquedas (entradas flat compactas, sin nivel en disco)
+search_cache = VideoCache(
+    ttl=Settings.SEARCH_CACHE_TTL,
+    max_entries=Settings.SEARCH_CACHE_MAX_ENTRIES,
+    max_bytes=Settings.SEARCH_CACHE_MAX_MB * 1024 * 1024
+)
+
+# Instancia global del caché de URLs de stream (compartido por todos los cogs)
+stream_cache = StreamURLCache(margin=Settings.STREAM_URL_EXPIRY_MARGIN)
+
+# Instancia global del caché de videos no disponibles
+failure_cache = FailureCache(ttl=Settings.FAILURE_CACHE_TTL)
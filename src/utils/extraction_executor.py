@@ -0,0 +1,131 @@
+"""
+Extraction Executor - Pool dedicado a yt-dlp
+Aísla las extracciones del executor por defecto del event loop, para que una
+importación grande no deje sin hilos al resto del bot.
+Soporta dos backends: hilos (por defecto) o procesos, que reparte el trabajo
+de yt-dlp (descifrado de firmas, parseo de JSON) entre varios núcleos
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from . import ytdl_worker
+from ..config.settings import Settings
+
+
+logger = logging.getLogger('MusicBot.Executor')
+
+
+class ExtractionExecutor:
+    """
+    Executor acotado para trabajo de yt-dlp con métricas de cola y workers activos
+    """
+
+    def __init__(self, max_workers: int = 4, backend: str = 'thread'):
+        """
+        Inicializar el executor.
+
+        Args:
+            max_workers: Número máximo de extracciones simultáneas (default: 4)
+            backend: 'thread' o 'process' (default: 'thread')
+        """
+        if backend not in ('thread', 'process'):
+            logger.warning(f'Backend de extracción desconocido "{backend}", usando hilos')
+            backend = 'thread'
+
+        self.max_workers = max_workers
+        self.backend = backend
+        self._executor: Optional[Executor] = None
+
+        # Métricas
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+
+    def configure(self, profiles: Dict[str, Dict]) -> None:
+        """
+        Registrar los perfiles de opciones de YoutubeDL y arrancar el pool.
+
+        Solo la primera llamada tiene efecto: todos los handlers comparten
+        el mismo pool y las mismas opciones.
+
+        Args:
+            profiles: Opciones de YoutubeDL por nombre de perfil
+        """
+        if self._executor is not None:
+            return
+
+        if self.backend == 'process':
+            # 'spawn' evita heredar hilos y el event loop del proceso principal
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=ytdl_worker.init_process,
+                initargs=(profiles,)
+            )
+        else:
+            ytdl_worker.configure(profiles)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ytdl')
+
+        logger.info(f'⚙️  Pool de extracción: {self.max_workers} {self.backend}(s)')
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecutar una función de ytdl_worker en el pool dedicado.
+
+        Args:
+            func: Función de nivel de módulo (serializable en modo procesos)
+            *args: Argumentos simples para la función
+
+        Returns:
+            El valor devuelto por la función
+        """
+        if self._executor is None:
+            raise RuntimeError('ExtractionExecutor no configurado')
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_event_loop()
+            result = await loop.run_in_executor(self._executor, func, *args)
+        except Exception:
+            self._failed += 1
+            raise
+        else:
+            self._completed += 1
+        finally:
+            self._in_flight -= 1
+        return result
+
+    def shutdown(self) -> None:
+        """Detener el pool sin esperar a las tareas en cola"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            if self.backend != 'process':
+                # Los procesos worker guardan sus cookies al terminar
+                ytdl_worker.save_cookies()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtener estadísticas del executor.
+
+        Returns:
+            Dict con workers, tareas activas, completadas y fallidas
+            (las esperas se ven por prioridad en el planificador)
+        """
+        return {
+            'backend': self.backend,
+            'max_workers': self.max_workers,
+            'active': min(self._in_flight, self.max_workers),
+            'completed': self._completed,
+            'failed': self._failed
+        }
+
+
+# Instancia global compartida por todos los YouTubeHandler
+extraction_executor = ExtractionExecutor(
+    max_workers=Settings.YTDL_MAX_WORKERS,
+    backend=Settings.YTDL_BACKEND
+)
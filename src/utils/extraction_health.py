@@ -0,0 +1,121 @@
+"""
+Extraction Health - Control adaptativo de la carga enviada a YouTube
+Cuando YouTube responde con 429 o con la comprobación anti-bots, reduce la
+concurrencia a la mitad (AIMD) y abre un circuito con espera exponencial
+durante el que ExtractionScheduler pausa el trabajo masivo (importaciones de
+Spotify, radio). Cada extracción correcta recupera concurrencia poco a poco
+"""
+import logging
+import time
+from typing import Any, Dict
+
+from ..config.settings import Settings
+
+
+logger = logging.getLogger('MusicBot.Health')
+
+
+class ExtractionHealth:
+    """
+    Tracker de salud compartido por todas las extracciones de yt-dlp.
+
+    - AIMD: +1/límite por extracción correcta, ÷2 por cada bloqueo.
+    - Backoff exponencial: cada bloqueo seguido duplica la espera del circuito.
+    - Circuito abierto: ExtractionScheduler pausa las peticiones masivas
+      hasta que se cierre; las interactivas siguen pasando dentro del límite.
+    """
+
+    def __init__(self, max_limit: int = 4, min_limit: int = 1,
+                 backoff_base: float = 5, backoff_max: float = 300):
+        """
+        Inicializar el tracker.
+
+        Args:
+            max_limit: Concurrencia máxima (normalmente = workers del pool)
+            min_limit: Concurrencia mínima aun con bloqueos (default: 1)
+            backoff_base: Espera tras el primer bloqueo en segundos (default: 5)
+            backoff_max: Espera máxima en segundos (default: 5 minutos)
+        """
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+
+        self._limit = float(max_limit)
+
+        self._streak = 0  # Bloqueos seguidos sin una extracción correcta
+        self._open_until = 0.0
+
+        # Métricas
+        self._throttles = 0
+        self._successes = 0
+        self._last_error = ''
+
+    @property
+    def limit(self) -> int:
+        """Número de extracciones simultáneas permitidas ahora mismo"""
+        return max(self.min_limit, int(self._limit))
+
+    def is_open(self) -> bool:
+        """True si el circuito está abierto (trabajo masivo en pausa)"""
+        return time.time() < self._open_until
+
+    def cooldown_remaining(self) -> float:
+        """Segundos que quedan hasta cerrar el circuito"""
+        return max(0.0, self._open_until - time.time())
+
+    def record_success(self) -> None:
+        """
+        Extracción correcta: recuperar concurrencia y reiniciar el backoff.
+
+        El circuito no se cierra aquí sino al terminar su espera: una extracción
+        lanzada antes del bloqueo no demuestra que YouTube haya dejado de limitar.
+        """
+        self._successes += 1
+        self._streak = 0
+        if self._limit < self.max_limit:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+    def record_throttle(self, message: str) -> None:
+        """
+        YouTube ha limitado una extracción: reducir concurrencia y abrir el circuito.
+
+        Args:
+            message: Mensaje del error de yt-dlp
+        """
+        self._throttles += 1
+        self._streak += 1
+        self._last_error = message[:120]
+        self._limit = max(float(self.min_limit), self._limit / 2)
+
+        cooldown = min(self._backoff_max, self._backoff_base * 2 ** (self._streak - 1))
+        self._open_until = max(self._open_until, time.time() + cooldown)
+        logger.warning(
+            f'🚦 YouTube está limitando peticiones: concurrencia {self.limit}, '
+            f'trabajo masivo en pausa {cooldown:.0f}s (bloqueo #{self._streak})'
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtener estadísticas de salud.
+
+        Returns:
+            Dict con límite actual, estado del circuito y bloqueos
+        """
+        return {
+            'limit': self.limit,
+            'max_limit': self.max_limit,
+            'open': self.is_open(),
+            'cooldown': round(self.cooldown_remaining()),
+            'throttles': self._throttles,
+            'successes': self._successes,
+            'last_error': self._last_error
+        }
+
+
+# Instancia global compartida por todos los YouTubeHandler
+extraction_health = ExtractionHealth(
+    max_limit=Settings.YTDL_MAX_WORKERS,
+    backoff_base=Settings.YTDL_BACKOFF_BASE,
+    backoff_max=Settings.YTDL_BACKOFF_MAX
+)
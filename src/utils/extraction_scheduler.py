@@ -0,0 +1,205 @@
+"""
+Extraction Scheduler - Planificador global de todo el trabajo de yt-dlp
+Reparte los huecos de extracción por prioridad (interactivo > prefetch >
+masivo) y, dentro de cada prioridad, por turnos entre servidores, para que
+una importación grande en un servidor no retrase la reproducción en otro
+"""
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, Optional
+
+from .extraction_health import ExtractionHealth, extraction_health
+from ..config.settings import Settings
+
+
+logger = logging.getLogger('MusicBot.Scheduler')
+
+# Prioridades de extracción, de mayor a menor
+PRIORITY_INTERACTIVE = 'interactive'  # !play de un video, stream de la canción que va a sonar
+PRIORITY_PREFETCH = 'prefetch'  # Pre-resolución de las siguientes canciones de la cola
+PRIORITY_BULK = 'bulk'  # Importaciones de Spotify, radio, recomendaciones
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_PREFETCH, PRIORITY_BULK)
+
+
+class ExtractionRequest:
+    """
+    Extracción esperando turno. Su prioridad puede subir mientras espera
+    (p. ej. un !play se une a una extracción lanzada por una importación)
+    """
+
+    __slots__ = ('priority', 'guild_id', 'future', 'enqueued_at')
+
+    def __init__(self, priority: str = PRIORITY_INTERACTIVE, guild_id: Optional[int] = None):
+        self.priority = priority if priority in PRIORITIES else PRIORITY_INTERACTIVE
+        self.guild_id = guild_id
+        self.future: Optional[asyncio.Future] = None
+        self.enqueued_at = 0.0
+
+
+class ExtractionScheduler:
+    """
+    Cola de prioridad global delante del pool de extracción.
+
+    - El presupuesto total de extracciones simultáneas es el límite
+      adaptativo de ExtractionHealth.
+    - Las peticiones interactivas se reparten antes que cualquier otra en
+      cola, y las no interactivas dejan `reserved` huecos libres para que
+      un !play nunca espere detrás de una importación.
+    - Dentro de cada prioridad, los servidores se atienden por turnos.
+    - Las masivas se pausan mientras el circuito de ExtractionHealth está abierto.
+    """
+
+    def __init__(self, health: ExtractionHealth, reserved: int = 1):
+        """
+        Inicializar el planificador.
+
+        Args:
+            health: Tracker que fija el presupuesto y el estado del circuito
+            reserved: Huecos reservados a peticiones interactivas (default: 1)
+        """
+        self._health = health
+        self._reserved = reserved
+
+        # Peticiones en espera {prioridad: {guild_id: deque}} (orden = turno)
+        self._queues: Dict[str, 'OrderedDict[Hashable, Deque[ExtractionRequest]]'] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+        self._active = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        # Métricas por prioridad
+        self._dispatched = {priority: 0 for priority in PRIORITIES}
+        self._wait_total = {priority: 0.0 for priority in PRIORITIES}
+        self._wait_max = {priority: 0.0 for priority in PRIORITIES}
+
+    async def acquire(self, request: ExtractionRequest) -> None:
+        """
+        Esperar un hueco de extracción.
+
+        Args:
+            request: Petición con su prioridad y servidor
+        """
+        loop = asyncio.get_running_loop()
+        request.enqueued_at = loop.time()
+        request.future = loop.create_future()
+        self._queues[request.priority].setdefault(request.guild_id, deque()).append(request)
+        self._dispatch()
+
+        try:
+            await request.future
+        except asyncio.CancelledError:
+            if request.future.done() and not request.future.cancelled():
+                # Se canceló justo después de recibir el hueco: devolverlo
+                self.release()
+            else:
+                self._remove(request)
+            raise
+
+    def release(self) -> None:
+        """Liberar el hueco de una extracción terminada y repartirlo"""
+        self._active -= 1
+        self._dispatch()
+
+    def promote(self, request: ExtractionRequest, priority: str) -> None:
+        """
+        Subir la prioridad de una petición.
+
+        Args:
+            request: Petición a promocionar
+            priority: Nueva prioridad (se ignora si no es mayor que la actual)
+        """
+        if priority not in PRIORITIES or PRIORITIES.index(priority) >= PRIORITIES.index(request.priority):
+            return
+
+        waiting = request.future is not None and not request.future.done()
+        if waiting:
+            self._remove(request)
+        request.priority = priority
+        if waiting:
+            self._queues[priority].setdefault(request.guild_id, deque()).append(request)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Repartir los huecos libres entre las peticiones en espera"""
+        loop = asyncio.get_running_loop()
+        while True:
+            request = self._next_request()
+            if request is None:
+                break
+
+            self._active += 1
+            waited = loop.time() - request.enqueued_at
+            self._dispatched[request.priority] += 1
+            self._wait_total[request.priority] += waited
+            self._wait_max[request.priority] = max(self._wait_max[request.priority], waited)
+            request.future.set_result(None)
+
+        self._schedule_resume()
+
+    def _next_request(self) -> Optional[ExtractionRequest]:
+        """Siguiente petición a la que dar hueco, o None si hay que esperar"""
+        limit = self._health.limit
+        for priority in PRIORITIES:
+            guilds = self._queues[priority]
+            if not guilds:
+                continue
+            if priority == PRIORITY_BULK and self._health.is_open():
+                continue
+
+            budget = limit if priority == PRIORITY_INTERACTIVE else max(1, limit - self._reserved)
+            if self._active >= budget:
+                continue
+
+            # Turno del primer servidor; pasa al final si le quedan peticiones
+            guild_id, pending = next(iter(guilds.items()))
+            request = pending.popleft()
+            del guilds[guild_id]
+            if pending:
+                guilds[guild_id] = pending
+            return request
+        return None
+
+    def _remove(self, request: ExtractionRequest) -> None:
+        """Quitar de la cola una petición que ya no espera"""
+        guilds = self._queues[request.priority]
+        pending = guilds.get(request.guild_id)
+        if pending and request in pending:
+            pending.remove(request)
+            if not pending:
+                del guilds[request.guild_id]
+
+    def _schedule_resume(self) -> None:
+        """Con masivas en pausa por el circuito, volver a repartir cuando se cierre"""
+        if not self._queues[PRIORITY_BULK] or not self._health.is_open():
+            return
+        if self._timer and not self._timer.cancelled() and self._timer.when() > asyncio.get_running_loop().time():
+            return
+
+        logger.debug(f'⏸️  Masivas en pausa {self._health.cooldown_remaining():.0f}s por el circuito')
+        self._timer = asyncio.get_running_loop().call_later(
+            self._health.cooldown_remaining() + 0.05, self._dispatch
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtener estadísticas del planificador.
+
+        Returns:
+            Dict con activas, presupuesto y, por prioridad, en cola,
+            repartidas y espera media/máxima en milisegundos
+        """
+        stats: Dict[str, Any] = {'active': self._active, 'budget': self._health.limit}
+        for priority in PRIORITIES:
+            dispatched = self._dispatched[priority]
+            stats[priority] = {
+                'queued': sum(len(pending) for pending in self._queues[priority].values()),
+                'dispatched': dispatched,
+                'avg_wait_ms': round(self._wait_total[priority] / dispatched * 1000) if dispatched else 0,
+                'max_wait_ms': round(self._wait_max[priority] * 1000)
+            }
+        return stats
+
+
+# Instancia global compartida por todos los YouTubeHandler
+extraction_scheduler = ExtractionScheduler(extraction_health, reserved=Settings.YTDL_RESERVED_INTERACTIVE)
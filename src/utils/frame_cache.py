@@ -0,0 +1,318 @@
+"""
+Frame Cache - Caché de paquetes Opus ya codificados
+Guarda el audio de las canciones que se reprodujeron completas para que las
+repeticiones (loop de canción, éxitos que suenan en muchos servidores) se
+sirvan sin yt-dlp, sin descarga y sin FFmpeg. Nivel LRU en memoria y, para
+las canciones que se repiten, un segundo nivel LRU en disco limitado por tamaño.
+Solo se graban las reproducciones con probabilidad de repetirse, y la memoria
+de las grabaciones en curso cuenta dentro del límite del caché
+"""
+import asyncio
+import logging
+import os
+import struct
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+
+from .audio_source import FRAMES_PER_SECOND
+from ..config.settings import Settings
+
+
+logger = logging.getLogger('MusicBot.FrameCache')
+
+# Cada paquete en disco va precedido de su longitud (uint16 big-endian)
+_LENGTH = struct.Struct('>H')
+_SUFFIX = '.opus'
+
+# Sobrecoste aproximado en memoria de cada paquete (objeto bytes + tupla)
+_PACKET_OVERHEAD = 40
+
+# Tamaño estimado de un paquete al reservar una grabación (Opus de YouTube, hasta ~160 kbps)
+_PACKET_ESTIMATE = 160 * 1000 // 8 // FRAMES_PER_SECOND + _PACKET_OVERHEAD
+
+
+class FrameCache:
+    """
+    Caché de paquetes Opus por (video, volumen).
+
+    La clave incluye el volumen porque fuera del 100% FFmpeg lo aplica al
+    codificar. Solo se guardan reproducciones completas, nunca canciones
+    saltadas o cortadas a mitad, y solo si es probable que se repitan
+    (loop de canción o ya sonó entera antes): la primera reproducción de una
+    canción solo se cuenta.
+    """
+
+    def __init__(self, max_memory_bytes: int, directory: Optional[str] = None,
+                 max_disk_bytes: int = 0, disk_min_plays: int = 2):
+        """
+        Inicializar el caché.
+
+        Args:
+            max_memory_bytes: Tamaño máximo en memoria
+            directory: Carpeta del nivel en disco (None = solo memoria)
+            max_disk_bytes: Tamaño máximo en disco
+            disk_min_plays: Reproducciones completas necesarias para pasar a disco
+        """
+        self._memory: 'OrderedDict[str, Tuple[bytes, ...]]' = OrderedDict()
+        self._memory_bytes = 0
+        self._max_memory_bytes = max_memory_bytes
+
+        self._directory = directory
+        self._max_disk_bytes = max_disk_bytes
+        self._disk_min_plays = disk_min_plays
+        self._disk: 'OrderedDict[str, int]' = OrderedDict()  # {clave: bytes}, orden LRU
+        self._disk_bytes = 0
+        self._writing: Set[str] = set()
+        self._plays: 'OrderedDict[str, int]' = OrderedDict()  # Reproducciones completas recientes
+        self._recording: Dict[str, int] = {}  # Grabaciones en curso {clave: bytes reservados}
+        self._recording_bytes = 0
+
+        # Métricas
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        if directory:
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(video_id: str, volume: float) -> str:
+        """
+        Clave de caché de una canción
+
+        Args:
+            video_id: ID del video de YouTube
+            volume: Volumen entre 0 y 1
+
+        Returns:
+            str: Clave '<video_id>@<volumen en %>'
+        """
+        return f'{video_id}@{round(volume * 100)}'
+
+    async def get(self, key: str) -> Optional[Tuple[bytes, ...]]:
+        """
+        Obtener los paquetes Opus de una canción.
+
+        Args:
+            key: Clave de make_key
+
+        Returns:
+            Tupla de paquetes Opus de 20 ms, o None si no está en caché
+        """
+        packets = self._memory.get(key)
+        if packets is not None:
+            self._memory.move_to_end(key)
+            self._hits += 1
+            return packets
+
+        if key in self._disk:
+            try:
+                packets = await asyncio.to_thread(self._read_file, key)
+            except OSError as e:
+                logger.warning(f'⚠️  No se pudo leer {key} del caché de audio: {e}')
+                self._forget_file(key)
+            else:
+                self._disk.move_to_end(key)
+                self._remember(key, packets)
+                self._hits += 1
+                self._disk_hits += 1
+                return packets
+
+        self._misses += 1
+        return None
+
+    def begin_recording(self, key: str, duration: int, replay_likely: bool = False) -> bool:
+        """
+        Decidir si grabar una reproducción y reservar su memoria (llamar desde el event loop).
+
+        Args:
+            key: Clave de make_key
+            duration: Duración de la canción en segundos
+            replay_likely: True si se sabe que se va a repetir (loop de canción)
+
+        Returns:
+            bool: True si hay que grabarla; luego llamar a store() o end_recording()
+        """
+        if key in self._recording or not (replay_likely or key in self._plays):
+            return False
+
+        size = duration * FRAMES_PER_SECOND * _PACKET_ESTIMATE
+        if self._recording_bytes + size > self._max_memory_bytes:
+            return False
+
+        self._recording[key] = size
+        self._recording_bytes += size
+        self._evict_memory()
+        return True
+
+    def end_recording(self, key: str) -> None:
+        """Liberar la memoria reservada de una grabación (llamar desde el event loop)"""
+        size = self._recording.pop(key, None)
+        if size is not None:
+            self._recording_bytes -= size
+
+    def store(self, key: str, packets: Optional[Sequence[bytes]] = None) -> None:
+        """
+        Registrar una reproducción completa y, si se grabó, guardarla (llamar desde el event loop).
+
+        Args:
+            key: Clave de make_key
+            packets: Paquetes Opus de la canción entera (None = no se grabó)
+        """
+        self.end_recording(key)
+
+        plays = self._plays.pop(key, 0) + 1
+        self._plays[key] = plays
+        while len(self._plays) > 5000:
+            self._plays.popitem(last=False)
+
+        if packets is None:
+            return
+        packets = tuple(packets)
+        self._remember(key, packets)
+
+        # Solo las canciones que se repiten merecen escribirse en disco
+        if (self._directory and plays >= self._disk_min_plays
+                and key not in self._disk and key not in self._writing):
+            self._writing.add(key)
+            future = asyncio.get_running_loop().run_in_executor(None, self._write_file, key, packets)
+            future.add_done_callback(lambda done, key=key: self._on_written(key, done))
+
+    def _remember(self, key: str, packets: Tuple[bytes, ...]) -> None:
+        """Guardar en memoria aplicando el límite de tamaño LRU"""
+        size = _packets_size(packets)
+        if size > self._max_memory_bytes:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= _packets_size(previous)
+        self._memory[key] = packets
+        self._memory_bytes += size
+        self._evict_memory()
+
+    def _evict_memory(self) -> None:
+        """Sacar de memoria las canciones menos usadas hasta caber junto a las grabaciones en curso"""
+        while self._memory and self._memory_bytes + self._recording_bytes > self._max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= _packets_size(evicted)
+
+    def _path(self, key: str) -> str:
+        """Ruta del archivo de una clave"""
+        return os.path.join(self._directory, key + _SUFFIX)
+
+    def _load_disk_index(self) -> None:
+        """Indexar los archivos existentes, del menos al más usado recientemente"""
+        if not os.path.isdir(self._directory):
+            return  # Se crea con la primera canción que se escriba
+
+        try:
+            entries = [
+                entry for entry in os.scandir(self._directory)
+                if entry.is_file() and entry.name.endswith(_SUFFIX)
+            ]
+        except OSError as e:
+            logger.error(f'❌ Caché de audio en disco desactivado ({self._directory}): {e}')
+            self._directory = None
+            return
+
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            size = entry.stat().st_size
+            self._disk[entry.name[:-len(_SUFFIX)]] = size
+            self._disk_bytes += size
+        self._evict_disk()
+        logger.info(f'✅ Caché de audio en disco: {len(self._disk)} canciones ({self._disk_bytes / 1024 / 1024:.0f} MB)')
+
+    def _read_file(self, key: str) -> Tuple[bytes, ...]:
+        """Leer los paquetes de una canción del disco (en un hilo)"""
+        path = self._path(key)
+        with open(path, 'rb') as f:
+            data = f.read()
+        os.utime(path)  # Marca de uso reciente para el LRU tras un reinicio
+
+        packets = []
+        offset = 0
+        while offset < len(data):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            packets.append(data[offset:offset + length])
+            offset += length
+        return tuple(packets)
+
+    def _write_file(self, key: str, packets: Tuple[bytes, ...]) -> int:
+        """Escribir una canción en disco (en un hilo) y devolver su tamaño"""
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            for packet in packets:
+                f.write(_LENGTH.pack(len(packet)))
+                f.write(packet)
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    def _on_written(self, key: str, done: 'asyncio.Future') -> None:
+        """Registrar en el índice una escritura terminada y aplicar el límite de tamaño"""
+        self._writing.discard(key)
+        if done.exception():
+            logger.warning(f'⚠️  No se pudo guardar {key} en el caché de audio: {done.exception()}')
+            return
+
+        size = done.result()
+        self._forget_file(key)
+        self._disk[key] = size
+        self._disk_bytes += size
+        self._evict_disk()
+        logger.debug(f'💾 Audio guardado en disco: {key} ({size / 1024:.0f} KB)')
+
+    def _evict_disk(self) -> None:
+        """Borrar las canciones menos usadas hasta quedar dentro del límite"""
+        while self._disk and self._disk_bytes > self._max_disk_bytes:
+            key = next(iter(self._disk))
+            self._forget_file(key)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _forget_file(self, key: str) -> None:
+        """Quitar una clave del índice del disco"""
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtener estadísticas del caché.
+
+        Returns:
+            Dict con canciones y MB en memoria y disco, grabaciones en curso,
+            aciertos y fallos
+        """
+        lookups = self._hits + self._misses
+        return {
+            'memory_entries': len(self._memory),
+            'memory_mb': round(self._memory_bytes / 1024 / 1024, 1),
+            'disk_entries': len(self._disk),
+            'disk_mb': round(self._disk_bytes / 1024 / 1024, 1),
+            'recording': len(self._recording),
+            'recording_mb': round(self._recording_bytes / 1024 / 1024, 1),
+            'hits': self._hits,
+            'disk_hits': self._disk_hits,
+            'misses': self._misses,
+            'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0
+        }
+
+
+def _packets_size(packets: Sequence[bytes]) -> int:
+    """Tamaño aproximado en memoria de una lista de paquetes"""
+    return sum(len(packet) for packet in packets) + len(packets) * _PACKET_OVERHEAD
+
+
+# Instancia global compartida por todos los servidores
+frame_cache = FrameCache(
+    max_memory_bytes=Settings.FRAME_CACHE_MEMORY_MB * 1024 * 1024,
+    directory=Settings.FRAME_CACHE_DIR or None,
+    max_disk_bytes=Settings.FRAME_CACHE_DISK_MB * 1024 * 1024,
+    disk_min_plays=Settings.FRAME_CACHE_DISK_MIN_PLAYS
+)
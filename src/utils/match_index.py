@@ -0,0 +1,152 @@
+"""
+Match Index - Correspondencias Spotify → YouTube ya resueltas
+Evita repetir la búsqueda en YouTube de un track de Spotify que ya se
+emparejó antes (en este servidor o en cualquier otro, antes o después
+de un reinicio)
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .persistent_cache import PersistentCache, persistent_cache
+from .url_parser import canonical_video_url
+
+
+logger = logging.getLogger('MusicBot.MatchIndex')
+
+
+class SpotifyMatchIndex:
+    """
+    Índice track de Spotify → video de YouTube.
+
+    Cada correspondencia se guarda con dos claves: el ID del track y su
+    ISRC (el mismo tema publicado en varios álbumes o recopilatorios
+    comparte ISRC). Tiene un nivel LRU en memoria delante de la tabla
+    spotify_matches del caché persistente.
+    """
+
+    def __init__(self, persistent: Optional[PersistentCache] = None, max_entries: int = 5000):
+        """
+        Inicializar el índice.
+
+        Args:
+            persistent: Caché en disco donde se guardan las correspondencias (opcional)
+            max_entries: Número máximo de claves en memoria (default: 5000)
+        """
+        self._memory: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._persistent = persistent
+        self._max_entries = max_entries
+
+        # Métricas
+        self._hits = 0
+        self._misses = 0
+
+    async def get(self, track: Dict) -> Optional[Dict[str, Any]]:
+        """
+        Buscar el video ya emparejado con un track de Spotify.
+
+        Args:
+            track: Track de SpotifyHandler (con 'id' y 'isrc')
+
+        Returns:
+            Dict con video_id, title, uploader, duration, thumbnail y
+            confidence, o None si no hay correspondencia guardada
+        """
+        for key in self._keys(track):
+            match = self._memory.get(key)
+            if match is None and self._persistent:
+                match = await self._persistent.get_spotify_match(key)
+                if match:
+                    self._remember(key, match)
+
+            if match:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                return match
+
+        self._misses += 1
+        return None
+
+    def set(self, track: Dict, entry: Dict, confidence: float) -> None:
+        """
+        Guardar el video elegido para un track de Spotify.
+
+        Args:
+            track: Track de SpotifyHandler (con 'id' y 'isrc')
+            entry: Resultado de búsqueda de YouTube (entrada flat compacta)
+            confidence: Confianza del emparejamiento (0-1)
+        """
+        video_id = entry.get('id')
+        keys = self._keys(track)
+        if not video_id or not keys:
+            return
+
+        data = {
+            'title': entry.get('title', 'Unknown'),
+            'uploader': entry.get('uploader', 'Unknown'),
+            'duration': entry.get('duration') or 0,
+            'thumbnail': entry.get('thumbnail') or '',
+            'confidence': round(confidence, 3)
+        }
+        for key in keys:
+            self._remember(key, {'video_id': video_id, **data})
+            if self._persistent:
+                self._persistent.set_spotify_match(key, video_id, data)
+
+    @staticmethod
+    def to_entry(match: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convertir una correspondencia guardada en una entrada de búsqueda
+
+        Args:
+            match: Valor devuelto por get()
+
+        Returns:
+            Dict con el mismo formato que YouTubeHandler.search
+        """
+        url = canonical_video_url(match['video_id'])
+        return {
+            'url': url,
+            'title': match.get('title', 'Unknown'),
+            'duration': match.get('duration') or 0,
+            'id': match['video_id'],
+            'uploader': match.get('uploader', 'Unknown'),
+            'webpage_url': url,
+            'thumbnail': match.get('thumbnail') or ''
+        }
+
+    @staticmethod
+    def _keys(track: Dict) -> List[str]:
+        """Claves de un track: ID de Spotify e ISRC (si lo tiene; los de álbum no)"""
+        keys = []
+        if track.get('id'):
+            keys.append(track['id'])
+        if track.get('isrc'):
+            keys.append(f"isrc:{track['isrc'].upper()}")
+        return keys
+
+    def _remember(self, key: str, match: Dict[str, Any]) -> None:
+        """Guardar en memoria aplicando el límite LRU"""
+        self._memory[key] = match
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtener estadísticas del índice.
+
+        Returns:
+            Dict con claves en memoria, aciertos, fallos y tasa de aciertos
+        """
+        lookups = self._hits + self._misses
+        return {
+            'entries': len(self._memory),
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Instancia global compartida por todos los cogs
+spotify_match_index = SpotifyMatchIndex(persistent_cache)
@@ -0,0 +1,297 @@
+"""
+Persistent Cache - Segundo nivel de caché en disco (SQLite)
+Guarda la metadata compacta de videos y las correspondencias Spotify → YouTube
+para que sobrevivan a reinicios y despliegues
+"""
+import aiosqlite
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from .track_info import TrackInfo
+from ..config.settings import Settings
+
+
+logger = logging.getLogger('MusicBot.PersistentCache')
+
+
+class PersistentCache:
+    """
+    Caché en SQLite con TTL, límite de tamaño y escrituras por lotes.
+
+    Las escrituras se acumulan en memoria y se vuelcan en una sola
+    transacción cada `flush_interval` segundos o al llegar a `batch_size`.
+    Todas las lecturas y escrituras comparten una única conexión, abierta
+    en start() y cerrada en close().
+    Las URLs de stream no se guardan: están ligadas a la IP del servidor
+    y a una expiración de pocas horas.
+    """
+
+    def __init__(self, db_path: str, ttl: int = 7 * 24 * 3600, max_entries: int = 20000,
+                 flush_interval: int = 30, batch_size: int = 50):
+        """
+        Inicializar el caché persistente.
+
+        Args:
+            db_path: Ruta del archivo SQLite
+            ttl: Tiempo de vida de cada entrada en segundos (default: 7 días)
+            max_entries: Número máximo de filas por tabla (default: 20000)
+            flush_interval: Segundos entre volcados a disco (default: 30)
+            batch_size: Escrituras pendientes que fuerzan un volcado (default: 50)
+        """
+        self.db_path = db_path
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+
+        # Escrituras pendientes {tabla: {clave: (video_id, data)}}
+        self._pending: Dict[str, Dict[str, tuple]] = {'track_metadata': {}, 'spotify_matches': {}}
+        self._db: Optional[aiosqlite.Connection] = None
+        self._ready = False
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        # Métricas
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+
+    async def start(self) -> None:
+        """Abrir la conexión, crear las tablas y lanzar el volcado periódico en segundo plano"""
+        try:
+            if self._db is None:
+                self._db = await aiosqlite.connect(self.db_path)
+            db = self._db
+            await db.execute('PRAGMA journal_mode=WAL')
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS track_metadata (
+                    video_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS spotify_matches (
+                    spotify_id TEXT PRIMARY KEY,
+                    video_id TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            await db.execute(
+                'CREATE INDEX IF NOT EXISTS idx_track_metadata_updated ON track_metadata(updated_at)'
+            )
+            await db.execute(
+                'CREATE INDEX IF NOT EXISTS idx_spotify_matches_updated ON spotify_matches(updated_at)'
+            )
+            await db.commit()
+
+            self._ready = True
+            if not self._flusher or self._flusher.done():
+                self._flusher = asyncio.create_task(self._flush_loop())
+            logger.info(f'✅ Persistent cache initialized: {self.db_path}')
+        except Exception as e:
+            logger.error(f'Error initializing persistent cache: {e}')
+
+    async def close(self) -> None:
+        """Volcar las escrituras pendientes, detener el volcado periódico y cerrar la conexión"""
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+
+        self._ready = False
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def get_track(self, video_id: str) -> Optional[TrackInfo]:
+        """
+        Obtener la metadata guardada de un video.
+
+        Args:
+            video_id: ID canónico del video
+
+        Returns:
+            TrackInfo (sin URL de stream) o None si no existe/expiró
+        """
+        pending = self._pending['track_metadata'].get(video_id)
+        if pending:
+            self._hits += 1
+            return TrackInfo(**pending[1])
+
+        row = await self._fetch_row(
+            'SELECT data, updated_at FROM track_metadata WHERE video_id = ?', video_id
+        )
+        if not row:
+            return None
+
+        try:
+            return TrackInfo(**json.loads(row[0]))
+        except (TypeError, ValueError) as e:
+            logger.debug(f'Entrada corrupta en caché persistente ({video_id}): {e}')
+            return None
+
+    def set_track(self, track: TrackInfo) -> None:
+        """
+        Encolar la metadata de un video para guardarla en disco.
+
+        Args:
+            track: Metadata compacta del video
+        """
+        if not self._ready or not track.id:
+            return
+
+        data = track._replace(stream_url=None, stream_expires=0)._asdict()
+        self._queue_write('track_metadata', track.id, track.id, data)
+
+    async def get_spotify_match(self, spotify_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtener el video de YouTube asociado a un track de Spotify.
+
+        Args:
+            spotify_id: ID del track de Spotify
+
+        Returns:
+            Dict con 'video_id' y los datos guardados, o None
+        """
+        pending = self._pending['spotify_matches'].get(spotify_id)
+        if pending:
+            self._hits += 1
+            return {'video_id': pending[0], **pending[1]}
+
+        row = await self._fetch_row(
+            'SELECT data, updated_at, video_id FROM spotify_matches WHERE spotify_id = ?', spotify_id
+        )
+        if not row:
+            return None
+
+        try:
+            return {'video_id': row[2], **json.loads(row[0])}
+        except ValueError:
+            return None
+
+    def set_spotify_match(self, spotify_id: str, video_id: str, data: Dict[str, Any]) -> None:
+        """
+        Encolar una correspondencia Spotify → YouTube para guardarla en disco.
+
+        Args:
+            spotify_id: ID del track de Spotify
+            video_id: ID del video de YouTube elegido
+            data: Datos adicionales (título, duración...)
+        """
+        if not self._ready or not spotify_id or not video_id:
+            return
+
+        self._queue_write('spotify_matches', spotify_id, video_id, data)
+
+    async def flush(self) -> None:
+        """Escribir en una sola transacción todas las escrituras pendientes"""
+        if not self._ready:
+            return
+
+        async with self._flush_lock:
+            tracks = self._pending['track_metadata']
+            matches = self._pending['spotify_matches']
+            if not tracks and not matches:
+                return
+            self._pending = {'track_metadata': {}, 'spotify_matches': {}}
+
+            now = time.time()
+            try:
+                await self._db.executemany(
+                    'INSERT OR REPLACE INTO track_metadata (video_id, data, updated_at) VALUES (?, ?, ?)',
+                    [(key, json.dumps(data), now) for key, (_, data) in tracks.items()]
+                )
+                await self._db.executemany(
+                    'INSERT OR REPLACE INTO spotify_matches (spotify_id, video_id, data, updated_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    [(key, video_id, json.dumps(data), now) for key, (video_id, data) in matches.items()]
+                )
+                await self._evict(self._db, now)
+                await self._db.commit()
+
+                self._writes += len(tracks) + len(matches)
+                logger.debug(f'💾 Persistent cache flush: {len(tracks)} tracks, {len(matches)} matches')
+            except Exception as e:
+                logger.error(f'Error writing persistent cache: {e}')
+                # La conexión es compartida: no dejar la transacción a medias
+                try:
+                    await self._db.rollback()
+                except Exception:
+                    pass
+
+                # Devolver el lote a pendientes para el siguiente volcado,
+                # sin pisar lo que se haya encolado mientras tanto
+                for table, entries in (('track_metadata', tracks), ('spotify_matches', matches)):
+                    for key, value in entries.items():
+                        self._pending[table].setdefault(key, value)
+
+    async def _evict(self, db, now: float) -> None:
+        """Borrar filas expiradas y las más antiguas por encima del límite"""
+        for table, key in (('track_metadata', 'video_id'), ('spotify_matches', 'spotify_id')):
+            await db.execute(f'DELETE FROM {table} WHERE updated_at < ?', (now - self._ttl,))
+            await db.execute(
+                f'DELETE FROM {table} WHERE {key} IN ('
+                f'SELECT {key} FROM {table} ORDER BY updated_at DESC LIMIT -1 OFFSET ?)',
+                (self._max_entries,)
+            )
+
+    def _queue_write(self, table: str, key: str, video_id: str, data: Dict[str, Any]) -> None:
+        """Añadir una escritura al lote y forzar el volcado si está lleno"""
+        self._pending[table][key] = (video_id, data)
+
+        pending_count = sum(len(entries) for entries in self._pending.values())
+        if pending_count >= self._batch_size:
+            asyncio.create_task(self.flush())
+
+    async def _fetch_row(self, query: str, key: str) -> Optional[tuple]:
+        """Leer una fila vigente (dentro del TTL) del caché"""
+        if not self._ready:
+            return None
+
+        try:
+            async with self._db.execute(query, (key,)) as cursor:
+                row = await cursor.fetchone()
+        except Exception as e:
+            logger.error(f'Error reading persistent cache: {e}')
+            return None
+
+        if not row or time.time() - row[1] > self._ttl:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return row
+
+    async def _flush_loop(self) -> None:
+        """Bucle de volcado periódico"""
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtener estadísticas del caché persistente.
+
+        Returns:
+            Dict con aciertos, fallos, escrituras y pendientes
+        """
+        return {
+            'enabled': self._ready,
+            'hits': self._hits,
+            'misses': self._misses,
+            'writes': self._writes,
+            'pending': sum(len(entries) for entries in self._pending.values())
+        }
+
+
+# Instancia global (None si PERSISTENT_CACHE_PATH está vacío)
+persistent_cache = PersistentCache(
+    Settings.PERSISTENT_CACHE_PATH,
+    ttl=Settings.PERSISTENT_CACHE_TTL,
+    max_entries=Settings.PERSISTENT_CACHE_MAX_ENTRIES
+) if Settings.PERSISTENT_CACHE_PATH else None
@@ -0,0 +1,103 @@
+"""
+Stream Prefetcher - Pre-resuelve las próximas canciones de la cola
+Mientras suena la canción actual, obtiene la URL de stream (y la metadata
+completa de entradas lazy) de las siguientes, para que el cambio de canción
+no espere a yt-dlp
+"""
+import asyncio
+import logging
+from typing import Optional, Set
+
+from .song import Song
+from .queue_manager import QueueManager
+from .youtube_handler import YouTubeHandler
+from .extraction_scheduler import PRIORITY_PREFETCH
+from ..config.settings import Settings
+
+
+logger = logging.getLogger('MusicBot.Prefetch')
+
+
+class StreamPrefetcher:
+    """
+    Prefetcher por servidor para las próximas entradas de un QueueManager
+    """
+
+    def __init__(self, youtube: YouTubeHandler, queue: QueueManager, depth: int = 2,
+                 guild_id: Optional[int] = None):
+        """
+        Inicializar el prefetcher
+
+        Args:
+            youtube: Handler de YouTube usado para resolver
+            queue: Cola del servidor
+            depth: Número de canciones a pre-resolver (default: 2)
+            guild_id: Servidor de la cola (turnos justos en el planificador)
+        """
+        self.youtube = youtube
+        self.queue = queue
+        self.depth = depth
+        self.guild_id = guild_id
+        self._task: Optional[asyncio.Task] = None
+        self._prepared: Set[int] = set()  # id() de canciones ya resueltas
+
+    def schedule(self) -> None:
+        """Lanzar (o relanzar) el prefetch de las próximas canciones"""
+        if self.depth <= 0:
+            return
+
+        self.cancel()
+        self._task = asyncio.create_task(self._run())
+
+    def invalidate(self) -> None:
+        """
+        Descartar el trabajo en curso tras cambiar el orden de la cola
+        (shuffle, move, remove, jump) y apuntar a las nuevas siguientes
+        """
+        self._prepared.clear()
+        self.schedule()
+
+    def cancel(self) -> None:
+        """Cancelar el prefetch en curso"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self):
+        """Resolver en orden las próximas canciones de la cola"""
+        try:
+            for song in self.queue.peek_next(self.depth):
+                await self._prepare(song)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f'Error en prefetch: {e}')
+
+    async def _prepare(self, song: Song):
+        """
+        Dejar una canción lista para reproducir
+
+        Args:
+            song: Canción a resolver
+        """
+        if id(song) in self._prepared and song.has_valid_stream(margin=Settings.STREAM_URL_EXPIRY_MARGIN):
+            return
+
+        if song.lazy:
+            # Entrada flat de playlist - obtener info completa (incluye el stream)
+            track = await self.youtube.extract_info(
+                song.url, priority=PRIORITY_PREFETCH, guild_id=self.guild_id
+            )
+            if track:
+                song.update_from_track(track)
+
+        if not song.has_valid_stream(margin=Settings.STREAM_URL_EXPIRY_MARGIN):
+            stream_url = await self.youtube.get_stream_url(
+                song.url, priority=PRIORITY_PREFETCH, guild_id=self.guild_id
+            )
+            if not stream_url:
+                return
+            song.set_stream(stream_url, self.youtube.parse_stream_expiry(stream_url))
+
+        self._prepared.add(id(song))
+        logger.debug(f'⚡ Prefetch listo: {song.title}')
@@ -86,6 +86,31 @@ class QueueManager:
         self.history.append(song)
         return song
 
+    def peek_next(self, count: int = 1) -> List[Song]:
+        """
+        Ver las próximas canciones que devolverá next() sin modificar la cola
+
+        Args:
+            count: Número de canciones a mirar
+
+        Returns:
+            List[Song]: Próximas canciones en orden de reproducción
+        """
+        if count <= 0:
+            return []
+
+        # Modo loop song - la siguiente siempre es la actual
+        if self.loop_mode == 'song' and self.history:
+            return [self.history[-1]]
+
+        upcoming = list(self.queue)[:count]
+
+        # Modo loop queue - tras vaciar la cola se recarga desde el historial
+        if len(upcoming) < count and self.loop_mode == 'queue':
+            upcoming.extend(list(self.history)[:count - len(upcoming)])
+
+        return upcoming
+
     def remove(self, index: int) -> bool:
         """
         Eliminar canción por índice (0-based)
@@ -101,6 +126,32 @@ class QueueManager:
             return True
         return False
 
+    def forget(self, song: Song) -> None:
+        """
+        Sacar una canción del historial para que los modos loop no la repitan
+        (p. ej. un video que ya no está disponible)
+
+        Args:
+            song: Canción a olvidar
+        """
+        try:
+            self.history.remove(song)
+        except ValueError:
+            pass
+
+    def requeue(self, song: Song) -> None:
+        """
+        Devolver al principio de la cola una canción que no se pudo empezar,
+        para reintentarla más tarde
+
+        Args:
+            song: Canción devuelta por next()
+        """
+        if self.loop_mode == 'song':
+            return  # next() la repetirá igualmente
+        self.forget(song)
+        self.queue.appendleft(song)
+
     def clear(self):
         """Limpiar completamente la cola"""
         self.queue.clear()
@@ -8,6 +8,7 @@ import random
 
 from .preferences_db import PreferencesDB
 from .youtube_handler import YouTubeHandler
+from .extraction_scheduler import PRIORITY_BULK
 
 
 logger = logging.getLogger('MusicBot.Recommendations')
@@ -44,7 +45,7 @@ class RecommendationEngine:
         if not liked_songs:
             # Si no hay datos, buscar música popular genérica
             logger.info(f'No preferences found for user {user_id}, returning popular music')
-            return await self._get_popular_music(count)
+            return await self._get_popular_music(count, guild_id)
 
         # Obtener artistas favoritos
         favorite_artists = await self.prefs_db.get_favorite_artists(user_id, guild_id, 5)
@@ -56,7 +57,8 @@ class RecommendationEngine:
         artist_recs = await self._recommend_from_favorite_artists(
             favorite_artists,
             disliked_artists,
-            int(count * 0.4)
+            int(count * 0.4),
+            guild_id
         )
         recommendations.extend(artist_recs)
 
@@ -64,7 +66,8 @@ class RecommendationEngine:
         similar_recs = await self._recommend_similar_songs(
             liked_songs,
             disliked_artists,
-            int(count * 0.4)
+            int(count * 0.4),
+            guild_id
         )
         recommendations.extend(similar_recs)
 
@@ -73,7 +76,8 @@ class RecommendationEngine:
             liked_songs,
             favorite_artists,
             disliked_artists,
-            count - len(recommendations)
+            count - len(recommendations),
+            guild_id
         )
         recommendations.extend(explore_recs)
 
@@ -84,7 +88,7 @@ class RecommendationEngine:
 
     async def _recommend_from_favorite_artists(self, favorite_artists: List[Dict],
                                                disliked_artists: List[str],
-                                               count: int) -> List[Dict]:
+                                               count: int, guild_id: Optional[int] = None) -> List[Dict]:
         """Buscar más canciones de artistas favoritos"""
         recommendations = []
 
@@ -97,7 +101,7 @@ class RecommendationEngine:
             try:
                 # Buscar canciones populares del artista
                 query = f"{artist} popular songs"
-                results = await self.youtube.search(query, limit=3)
+                results = await self.youtube.search(query, limit=3, priority=PRIORITY_BULK, guild_id=guild_id)
 
                 recommendations.extend(results)
 
@@ -110,7 +114,7 @@ class RecommendationEngine:
 
     async def _recommend_similar_songs(self, liked_songs: List[Dict],
                                       disliked_artists: List[str],
-                                      count: int) -> List[Dict]:
+                                      count: int, guild_id: Optional[int] = None) -> List[Dict]:
         """Buscar canciones similares a las que le gustaron"""
         recommendations = []
 
@@ -122,7 +126,7 @@ class RecommendationEngine:
             try:
                 # Buscar canciones similares usando el título como referencia
                 query = f"{song['song_title']} similar songs"
-                results = await self.youtube.search(query, limit=2)
+                results = await self.youtube.search(query, limit=2, priority=PRIORITY_BULK, guild_id=guild_id)
 
                 # Filtrar artistas no deseados
                 filtered_results = [
@@ -142,7 +146,7 @@ class RecommendationEngine:
     async def _explore_new_music(self, liked_songs: List[Dict],
                                 favorite_artists: List[Dict],
                                 disliked_artists: List[str],
-                                count: int) -> List[Dict]:
+                                count: int, guild_id: Optional[int] = None) -> List[Dict]:
         """Explorar nueva música basada en géneros/estilos que le gustan"""
         recommendations = []
 
@@ -152,7 +156,7 @@ class RecommendationEngine:
         for keyword in keywords[:3]:
             try:
                 query = f"{keyword} music"
-                results = await self.youtube.search(query, limit=2)
+                results = await self.youtube.search(query, limit=2, priority=PRIORITY_BULK, guild_id=guild_id)
 
                 # Filtrar artistas no deseados
                 filtered_results = [
@@ -199,7 +203,7 @@ class RecommendationEngine:
 
         return keywords
 
-    async def _get_popular_music(self, count: int) -> List[Dict]:
+    async def _get_popular_music(self, count: int, guild_id: Optional[int] = None) -> List[Dict]:
         """Obtener música popular genérica cuando no hay preferencias"""
         try:
             queries = [
@@ -210,7 +214,7 @@ class RecommendationEngine:
             ]
 
             query = random.choice(queries)
-            results = await self.youtube.search(query, limit=count)
+            results = await self.youtube.search(query, limit=count, priority=PRIORITY_BULK, guild_id=guild_id)
             return results
         except Exception as e:
             logger.error(f'Error getting popular music: {e}')
@@ -224,7 +228,8 @@ class RecommendationEngine:
         """
         return await self.prefs_db.should_avoid_artist(user_id, guild_id, artist)
 
-    async def find_playlist_by_query(self, query: str, limit: int = 1) -> List[Dict]:
+    async def find_playlist_by_query(self, query: str, limit: int = 1,
+                                     guild_id: Optional[int] = None) -> List[Dict]:
         """
         Buscar playlists en YouTube basadas en una query contextual
         Ejemplos: "rock music", "hits 2010", "chill vibes", etc.
@@ -232,6 +237,7 @@ class RecommendationEngine:
         Args:
             query: Query de búsqueda (ej: "rock", "hits 2010")
             limit: Número de playlists a buscar
+            guild_id: Servidor que hace la petición (turnos justos entre servidores)
 
         Returns:
             List[Dict]: Lista de playlists encontradas
@@ -248,7 +254,7 @@ class RecommendationEngine:
             all_results = []
 
             for enhanced_query in enhanced_queries[:2]:  # Probar 2 variaciones
-                results = await self.youtube.search(enhanced_query, limit=limit * 2)
+                results = await self.youtube.search(enhanced_query, limit=limit * 2, priority=PRIORITY_BULK, guild_id=guild_id)
 
                 # Filtrar por resultados que parezcan playlists/compilaciones
                 playlist_results = [
@@ -289,7 +295,7 @@ class RecommendationEngine:
             # Si hay canción semilla, buscar similares
             try:
                 query = f"{seed_song.get('title', '')} radio"
-                results = await self.youtube.search(query, limit=queue_size // 2)
+                results = await self.youtube.search(query, limit=queue_size // 2, priority=PRIORITY_BULK, guild_id=guild_id)
                 queue.extend(results)
             except:
                 pass
@@ -3,7 +3,9 @@ Song Model - Representa una canción en el sistema
 """
 from dataclasses import dataclass
 import discord
+import time
 from typing import Optional
+from .track_info import TrackInfo
 
 
 @dataclass
@@ -16,6 +18,9 @@ class Song:
     requester: discord.Member
     source: str = 'youtube'  # 'youtube' o 'spotify'
     uploader: str = 'Unknown'
+    stream_url: Optional[str] = None  # URL del formato de audio ya resuelto
+    stream_expires: float = 0  # Timestamp de expiración de stream_url
+    lazy: bool = False  # True si solo tiene metadata básica (entrada flat de playlist)
 
     @classmethod
     def from_youtube_info(cls, info: dict, requester: discord.Member):
@@ -36,9 +41,72 @@ class Song:
             thumbnail=info.get('thumbnail', ''),
             requester=requester,
             source='youtube',
-            uploader=info.get('uploader', 'Unknown')
+            uploader=info.get('uploader', 'Unknown'),
+            lazy=bool(info.get('_lazy'))
         )
 
+    @classmethod
+    def from_track_info(cls, track: TrackInfo, requester: discord.Member):
+        """
+        Crear Song desde un TrackInfo (extracción completa ya reducida)
+
+        Args:
+            track: Metadata compacta del video
+            requester: Miembro de Discord que solicitó la canción
+
+        Returns:
+            Song: Instancia de Song con el stream ya resuelto
+        """
+        song = cls(
+            title=track.title,
+            url=track.webpage_url,
+            duration=track.duration,
+            thumbnail=track.thumbnail,
+            requester=requester,
+            source='youtube',
+            uploader=track.uploader
+        )
+        song.set_stream(track.stream_url, track.stream_expires)
+        return song
+
+    def update_from_track(self, track: TrackInfo) -> None:
+        """
+        Completar la metadata de una canción lazy con la info completa
+
+        Args:
+            track: Metadata compacta del video
+        """
+        self.title = track.title or self.title
+        self.duration = track.duration or self.duration
+        self.thumbnail = track.thumbnail or self.thumbnail
+        self.uploader = track.uploader or self.uploader
+        if track.stream_url:
+            self.set_stream(track.stream_url, track.stream_expires)
+        self.lazy = False
+
+    def set_stream(self, stream_url: Optional[str], expires: float) -> None:
+        """
+        Guardar la URL de stream resuelta y su expiración
+
+        Args:
+            stream_url: URL directa del audio (googlevideo)
+            expires: Timestamp UNIX en que la URL deja de ser válida
+        """
+        self.stream_url = stream_url
+        self.stream_expires = expires if stream_url else 0
+
+    def has_valid_stream(self, margin: int = 0) -> bool:
+        """
+        Verificar si la URL de stream guardada sigue siendo utilizable
+
+        Args:
+            margin: Segundos de margen antes de la expiración real
+
+        Returns:
+            bool: True si hay URL y no expira en los próximos `margin` segundos
+        """
+        return bool(self.stream_url) and time.time() < self.stream_expires - margin
+
     def format_duration(self) -> str:
         """
         Formatear duración como MM:SS o HH:MM:SS
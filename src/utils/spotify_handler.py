@@ -4,18 +4,40 @@ Convierte enlaces de Spotify a búsquedas de YouTube
 """
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
+import asyncio
+import functools
 import os
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 import logging
+from .url_parser import parse_spotify_url
+from ..config.settings import Settings
 
 
 logger = logging.getLogger('MusicBot.Spotify')
 
+# Pool dedicado para el cliente síncrono de spotipy (peticiones HTTP y
+# renovación del token), compartido por todas las instancias del handler
+_spotify_executor = ThreadPoolExecutor(max_workers=Settings.SPOTIFY_MAX_WORKERS, thread_name_prefix='spotify')
+
+# Paginación de la API (máximos permitidos por Spotify)
+PLAYLIST_PAGE_SIZE = 100
+ALBUM_PAGE_SIZE = 50
+
+# Solo los campos que usa _track_to_dict, para respuestas más pequeñas
+PLAYLIST_ITEM_FIELDS = (
+    'total,items(track(id,name,duration_ms,external_ids(isrc),external_urls(spotify),'
+    'artists(name),album(name,images)))'
+)
+
 
 class SpotifyHandler:
     """
     Handler para interactuar con la API de Spotify
     Extrae metadatos de tracks, álbumes y playlists para buscarlos en YouTube
+    OPTIMIZADO: spotipy es síncrono, así que todas las llamadas a la API se
+    ejecutan en un pool de hilos propio con timeout y nunca bloquean el event
+    loop (ni el audio de otros servidores)
     """
 
     def __init__(self, client_id: str = None, client_secret: str = None):
@@ -40,7 +62,12 @@ class SpotifyHandler:
                 client_id=self.client_id,
                 client_secret=self.client_secret
             )
-            self.sp = spotipy.Spotify(auth_manager=auth_manager)
+            # La sesión de requests reutiliza conexiones HTTP entre llamadas
+            self.sp = spotipy.Spotify(
+                auth_manager=auth_manager,
+                requests_timeout=Settings.SPOTIFY_TIMEOUT,
+                retries=3
+            )
             logger.info('✅ Spotify API initialized successfully')
         except Exception as e:
             logger.error(f'Error initializing Spotify API: {e}')
@@ -55,6 +82,29 @@ class SpotifyHandler:
         """
         return self.sp is not None
 
+    async def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Ejecutar un método de spotipy en el pool de Spotify
+
+        Args:
+            method: Nombre del método de spotipy.Spotify (p. ej. 'track')
+            *args: Argumentos posicionales del método
+            **kwargs: Argumentos con nombre del método
+
+        Returns:
+            La respuesta de la API
+
+        Raises:
+            asyncio.TimeoutError: Si la llamada (con reintentos) tarda demasiado
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(getattr(self.sp, method), *args, **kwargs)
+        # Margen sobre el timeout HTTP para los reintentos internos de spotipy
+        return await asyncio.wait_for(
+            loop.run_in_executor(_spotify_executor, call),
+            timeout=Settings.SPOTIFY_TIMEOUT * 2
+        )
+
     @staticmethod
     def is_spotify_url(url: str) -> bool:
         """
@@ -66,7 +116,7 @@ class SpotifyHandler:
         Returns:
             bool: True si es una URL de Spotify
         """
-        return 'spotify.com' in url.lower()
+        return parse_spotify_url(url) is not None
 
     @staticmethod
     def get_url_type(url: str) -> Optional[str]:
@@ -79,13 +129,27 @@ class SpotifyHandler:
         Returns:
             str: 'track', 'album', 'playlist', o None
         """
-        if 'track' in url:
-            return 'track'
-        elif 'album' in url:
-            return 'album'
-        elif 'playlist' in url:
-            return 'playlist'
-        return None
+        ref = parse_spotify_url(url)
+        return ref.kind if ref else None
+
+    @staticmethod
+    def extract_id(url: str) -> str:
+        """
+        Extraer el ID de una URL o URI de Spotify
+
+        Args:
+            url: URL de Spotify (open.spotify.com, intl-xx, spotify:tipo:ID)
+
+        Returns:
+            str: ID de 22 caracteres
+
+        Raises:
+            ValueError: Si la URL no es de Spotify
+        """
+        ref = parse_spotify_url(url)
+        if not ref:
+            raise ValueError(f'URL de Spotify no válida: {url}')
+        return ref.id
 
     async def get_track_info(self, url: str) -> Optional[Dict]:
         """
@@ -103,19 +167,12 @@ class SpotifyHandler:
 
         try:
             # Extraer ID del track de la URL
-            track_id = url.split('track/')[-1].split('?')[0]
+            track_id = self.extract_id(url)
 
             # Obtener información del track
-            track = self.sp.track(track_id)
-
-            return {
-                'name': track['name'],
-                'artists': [artist['name'] for artist in track['artists']],
-                'album': track['album']['name'],
-                'duration_ms': track['duration_ms'],
-                'url': track['external_urls']['spotify'],
-                'thumbnail': track['album']['images'][0]['url'] if track['album']['images'] else None
-            }
+            track = await self._call('track', track_id)
+
+            return self._track_to_dict(track)
         except Exception as e:
             logger.error(f'Error getting track info from {url}: {e}')
             return None
@@ -123,35 +180,41 @@ class SpotifyHandler:
     async def get_album_tracks(self, url: str) -> List[Dict]:
         """
         Obtener todos los tracks de un álbum
+        OPTIMIZADO: la primera página llega con el álbum; el resto se pide
+        en paralelo una vez conocido el total
 
         Args:
             url: URL del álbum
 
         Returns:
-            List[Dict]: Lista de información de tracks
+            List[Dict]: Lista de información de tracks (máximo MAX_QUEUE_SIZE)
         """
         if not self.sp:
             return []
 
         try:
             # Extraer ID del álbum
-            album_id = url.split('album/')[-1].split('?')[0]
-
-            # Obtener información del álbum
-            album = self.sp.album(album_id)
+            album_id = self.extract_id(url)
+
+            # Obtener información del álbum (incluye la primera página de tracks).
+            # Los tracks de álbum son simplificados y no traen external_ids: sin
+            # ISRC, sus correspondencias solo se reutilizan por ID de Spotify
+            album = await self._call('album', album_id)
+            first_page = album['tracks']
+
+            pages = await self._fetch_remaining_pages(
+                first_page,
+                lambda offset: self._call('album_tracks', album_id, limit=ALBUM_PAGE_SIZE, offset=offset),
+                ALBUM_PAGE_SIZE
+            )
 
             tracks = []
-            for track in album['tracks']['items']:
-                tracks.append({
-                    'name': track['name'],
-                    'artists': [artist['name'] for artist in track['artists']],
-                    'album': album['name'],
-                    'duration_ms': track['duration_ms'],
-                    'url': track['external_urls']['spotify'],
-                    'thumbnail': album['images'][0]['url'] if album['images'] else None
-                })
-
-            return tracks
+            for page in pages:
+                for track in page['items']:
+                    if track:
+                        tracks.append(self._track_to_dict(track, album))
+
+            return tracks[:Settings.MAX_QUEUE_SIZE]
         except Exception as e:
             logger.error(f'Error getting album tracks from {url}: {e}')
             return []
@@ -159,41 +222,99 @@ class SpotifyHandler:
     async def get_playlist_tracks(self, url: str) -> List[Dict]:
         """
         Obtener todos los tracks de una playlist
+        OPTIMIZADO: páginas de 100 con filtro de campos; tras la primera,
+        el resto se pide en paralelo hasta llegar a MAX_QUEUE_SIZE
 
         Args:
             url: URL de la playlist
 
         Returns:
-            List[Dict]: Lista de información de tracks
+            List[Dict]: Lista de información de tracks (máximo MAX_QUEUE_SIZE)
         """
         if not self.sp:
             return []
 
         try:
             # Extraer ID de la playlist
-            playlist_id = url.split('playlist/')[-1].split('?')[0]
+            playlist_id = self.extract_id(url)
+
+            def fetch_page(offset):
+                return self._call(
+                    'playlist_items', playlist_id, fields=PLAYLIST_ITEM_FIELDS,
+                    limit=PLAYLIST_PAGE_SIZE, offset=offset, additional_types=('track',)
+                )
 
-            # Obtener información de la playlist
-            playlist = self.sp.playlist(playlist_id)
+            first_page = await fetch_page(0)
+            pages = await self._fetch_remaining_pages(first_page, fetch_page, PLAYLIST_PAGE_SIZE)
 
             tracks = []
-            for item in playlist['tracks']['items']:
-                track = item['track']
-                if track:  # Algunos tracks pueden ser None
-                    tracks.append({
-                        'name': track['name'],
-                        'artists': [artist['name'] for artist in track['artists']],
-                        'album': track['album']['name'],
-                        'duration_ms': track['duration_ms'],
-                        'url': track['external_urls']['spotify'],
-                        'thumbnail': track['album']['images'][0]['url'] if track['album']['images'] else None
-                    })
-
-            return tracks
+            for page in pages:
+                for item in page['items']:
+                    track = item.get('track')
+                    # Algunos tracks pueden ser None (borrados) o locales sin metadata
+                    if track and track.get('name'):
+                        tracks.append(self._track_to_dict(track))
+
+            return tracks[:Settings.MAX_QUEUE_SIZE]
         except Exception as e:
             logger.error(f'Error getting playlist tracks from {url}: {e}')
             return []
 
+    async def _fetch_remaining_pages(self, first_page: Dict, fetch_page, page_size: int) -> List[Dict]:
+        """
+        Pedir en paralelo las páginas que faltan tras la primera
+
+        Args:
+            first_page: Primera página (con 'total' e 'items')
+            fetch_page: Función offset -> corrutina que devuelve la página
+            page_size: Tamaño de página usado por fetch_page
+
+        Returns:
+            List[Dict]: Las páginas obtenidas en orden (se omiten las que fallan),
+                sin pasar de MAX_QUEUE_SIZE tracks
+        """
+        total = min(first_page.get('total') or 0, Settings.MAX_QUEUE_SIZE)
+        offsets = range(len(first_page['items']), total, page_size)
+        if not offsets:
+            return [first_page]
+
+        logger.info(f'📄 Pidiendo {len(offsets)} páginas más de Spotify ({total} tracks)')
+        results = await asyncio.gather(*(fetch_page(offset) for offset in offsets), return_exceptions=True)
+
+        # Una página fallida no tira las demás: se pierden solo sus tracks
+        pages = [first_page]
+        for offset, result in zip(offsets, results):
+            if isinstance(result, BaseException):
+                logger.warning(f'⚠️  No se pudo obtener la página de Spotify en offset {offset}: {result}')
+            else:
+                pages.append(result)
+        return pages
+
+    @staticmethod
+    def _track_to_dict(track: Dict, album: Optional[Dict] = None) -> Dict:
+        """
+        Reducir un track de la API de Spotify a los campos que usa el bot
+
+        Args:
+            track: Objeto track de la API
+            album: Álbum al que pertenece (los tracks de álbum no lo incluyen)
+
+        Returns:
+            Dict: Información del track ('isrc' es None en tracks de álbum)
+        """
+        album = album or track.get('album') or {}
+        images = album.get('images') or []
+        return {
+            'id': track.get('id'),
+            'isrc': (track.get('external_ids') or {}).get('isrc'),
+            'name': track['name'],
+            'artists': [artist['name'] for artist in track.get('artists', [])],
+            'album': album.get('name', ''),
+            'duration_ms': track.get('duration_ms', 0),
+            'url': (track.get('external_urls') or {}).get('spotify', ''),
+            'thumbnail': images[0]['url'] if images else None
+        }
+
     def to_youtube_query(self, track_info: Dict) -> str:
         """
         Convertir información de track de Spotify a query de búsqueda de YouTube
@@ -0,0 +1,57 @@
+"""
+Track Info - Registro compacto de metadata de un video de YouTube
+Sustituye al diccionario completo de yt-dlp (formats, thumbnails, captions...)
+que puede ocupar cientos de KB por video
+"""
+from typing import Dict, NamedTuple, Optional
+
+
+class TrackInfo(NamedTuple):
+    """Metadata mínima para reproducir un video y mostrarlo en embeds"""
+    id: str
+    title: str
+    webpage_url: str
+    duration: int  # en segundos
+    thumbnail: str
+    uploader: str
+    stream_url: Optional[str] = None  # URL del formato de audio elegido
+    stream_expires: float = 0  # Timestamp de expiración de stream_url
+    audio_codec: Optional[str] = None  # p. ej. 'opus', 'mp4a.40.2'
+    audio_ext: Optional[str] = None  # p. ej. 'webm', 'm4a'
+    abr: float = 0  # Bitrate de audio en kbps
+    is_live: bool = False
+
+    @classmethod
+    def from_ytdlp(cls, info: Dict, stream_url: Optional[str] = None,
+                   stream_expires: float = 0) -> 'TrackInfo':
+        """
+        Crear TrackInfo desde una extracción completa de yt-dlp
+
+        Args:
+            info: Diccionario de un video devuelto por YoutubeDL.extract_info
+            stream_url: URL de audio ya elegida (opcional)
+            stream_expires: Expiración de stream_url
+
+        Returns:
+            TrackInfo: Registro compacto con los campos necesarios
+        """
+        # Formato de audio elegido por yt-dlp ('bestaudio/best')
+        audio_format = info
+        if info.get('requested_formats'):
+            audio_format = info['requested_formats'][0]
+
+        video_id = info.get('id') or ''
+        return cls(
+            id=video_id,
+            title=info.get('title', 'Sin título'),
+            webpage_url=info.get('webpage_url') or f'https://www.youtube.com/watch?v={video_id}',
+            duration=int(info.get('duration') or 0),
+            thumbnail=info.get('thumbnail') or '',
+            uploader=info.get('uploader') or info.get('channel') or 'Unknown',
+            stream_url=stream_url,
+            stream_expires=stream_expires if stream_url else 0,
+            audio_codec=audio_format.get('acodec'),
+            audio_ext=audio_format.get('ext'),
+            abr=float(audio_format.get('abr') or 0),
+            is_live=bool(info.get('is_live'))
+        )
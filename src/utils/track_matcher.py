@@ -0,0 +1,139 @@
+"""
+Track Matcher - Elige el mejor video de YouTube para un track de Spotify
+Puntúa los resultados de una única búsqueda (sin peticiones extra) por
+duración, coincidencia de título y artista, y tipo de canal
+"""
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# Pesos de cada señal (suman 1)
+_WEIGHT_DURATION = 0.45
+_WEIGHT_TITLE = 0.25
+_WEIGHT_ARTIST = 0.15
+_WEIGHT_CHANNEL = 0.15
+
+# Diferencia de duración (segundos) tolerada sin penalización y a partir de la cual puntúa 0
+_DURATION_EXACT = 3
+_DURATION_MAX = 30
+
+# Versiones que casi nunca son la buena salvo que el track de Spotify lo diga
+_UNWANTED_WORDS = (
+    'cover', 'live', 'karaoke', 'remix', 'instrumental', 'nightcore', 'slowed',
+    'sped up', 'reverb', '8d', 'reaction', 'hour', 'hours', 'loop', 'tutorial', 'lyrics video'
+)
+# Basta una para quedar por debajo de SPOTIFY_MATCH_MIN_CONFIDENCE (0.6) aunque
+# el resto de señales sean perfectas: puede reproducirse, pero no se guarda
+_UNWANTED_PENALTY = 0.45
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Palabras que no aportan al comparar títulos
+_STOPWORDS = {'the', 'a', 'an', 'and', 'feat', 'ft', 'with', 'official', 'audio', 'video', 'music', 'de', 'la', 'el', 'y'}
+
+
+def score_candidate(track: Dict, entry: Dict) -> float:
+    """
+    Puntuar un resultado de búsqueda frente a un track de Spotify
+
+    Args:
+        track: Track de SpotifyHandler (name, artists, duration_ms)
+        entry: Resultado flat de YouTubeHandler.search
+
+    Returns:
+        float: Confianza entre 0 y 1
+    """
+    title = _normalize(entry.get('title', ''))
+    uploader = _normalize(entry.get('uploader', ''))
+    name = _normalize(track.get('name', ''))
+    artists = [_normalize(artist) for artist in track.get('artists', [])]
+
+    score = (
+        _WEIGHT_DURATION * _duration_score(track, entry)
+        + _WEIGHT_TITLE * _overlap(_tokens(name), _tokens(title))
+        + _WEIGHT_ARTIST * _artist_score(artists, title, uploader)
+        + _WEIGHT_CHANNEL * _channel_score(artists, entry.get('uploader', ''), uploader)
+    )
+
+    # Covers, directos, loops de 10 horas... que el track original no menciona
+    for word in _UNWANTED_WORDS:
+        if _contains_word(title, word) and not _contains_word(name, word):
+            score -= _UNWANTED_PENALTY
+
+    return max(0.0, min(1.0, score))
+
+
+def pick_best(track: Dict, entries: List[Dict]) -> Tuple[Optional[Dict], float]:
+    """
+    Elegir el mejor resultado para un track de Spotify
+
+    Args:
+        track: Track de SpotifyHandler
+        entries: Resultados de una búsqueda (en el orden de YouTube)
+
+    Returns:
+        Tuple: (mejor resultado o None si no hay, confianza)
+    """
+    best, best_score = None, -1.0
+    for entry in entries:
+        score = score_candidate(track, entry)
+        # En empate se mantiene el orden de relevancia de YouTube
+        if score > best_score:
+            best, best_score = entry, score
+    return best, max(best_score, 0.0)
+
+
+def _duration_score(track: Dict, entry: Dict) -> float:
+    """1 si las duraciones coinciden, bajando a 0 con _DURATION_MAX segundos de diferencia"""
+    expected = (track.get('duration_ms') or 0) / 1000
+    actual = entry.get('duration') or 0
+    if not expected or not actual:
+        return 0.5  # Sin datos: neutral
+
+    diff = abs(expected - actual)
+    if diff <= _DURATION_EXACT:
+        return 1.0
+    return max(0.0, 1 - (diff - _DURATION_EXACT) / (_DURATION_MAX - _DURATION_EXACT))
+
+
+def _artist_score(artists: List[str], title: str, uploader: str) -> float:
+    """Fracción de artistas que aparecen en el título o en el canal"""
+    if not artists:
+        return 0.5
+    found = sum(1 for artist in artists if artist and (artist in title or artist in uploader))
+    return found / len(artists)
+
+
+def _channel_score(artists: List[str], raw_uploader: str, uploader: str) -> float:
+    """Canales oficiales: '<Artista> - Topic' (YouTube Music), VEVO o el propio artista"""
+    if raw_uploader.endswith(' - Topic'):
+        return 1.0
+    if 'vevo' in uploader:
+        return 0.9
+    if any(artist and uploader.replace(' ', '') == artist.replace(' ', '') for artist in artists):
+        return 0.8
+    return 0.0
+
+
+def _overlap(expected: Set[str], actual: Set[str]) -> float:
+    """Fracción de los tokens esperados presentes en el candidato"""
+    if not expected:
+        return 0.5
+    return len(expected & actual) / len(expected)
+
+
+def _tokens(text: str) -> Set[str]:
+    """Tokens significativos de un texto ya normalizado"""
+    return {token for token in _TOKEN_RE.findall(text) if token not in _STOPWORDS}
+
+
+def _contains_word(text: str, word: str) -> bool:
+    """Verificar si un texto normalizado contiene una palabra o expresión completa"""
+    return re.search(rf'\b{re.escape(word)}\b', text) is not None
+
+
+def _normalize(text: str) -> str:
+    """Minúsculas y sin acentos, para comparar títulos escritos de forma distinta"""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
@@ -0,0 +1,143 @@
+"""
+URL Parser - Normalización de URLs de YouTube y Spotify a IDs canónicos
+Todas las variantes de un mismo video (youtu.be/X, watch?v=X&t=30,
+music.youtube.com/watch?v=X...) se reducen al mismo ID, que es la clave
+usada por los cachés y la deduplicación de extracciones
+"""
+import re
+from typing import NamedTuple, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+# Dominios de YouTube (www., m., music., youtu.be, youtube-nocookie)
+_YOUTUBE_HOST_RE = re.compile(
+    r'^(?:[\w-]+\.)?(?:youtube\.com|youtube-nocookie\.com|youtu\.be)$',
+    re.IGNORECASE
+)
+
+# ID de video en la ruta: /shorts/X, /embed/X, /live/X, /v/X (youtube.com) o /X (youtu.be)
+_VIDEO_PATH_RE = re.compile(r'^/(?:shorts|embed|live|v)/([\w-]{11})(?:/|$)')
+_SHORT_PATH_RE = re.compile(r'^/([\w-]{11})(?:/|$)')
+
+_VIDEO_ID_RE = re.compile(r'^[\w-]{11}$')
+_PLAYLIST_ID_RE = re.compile(r'^[\w-]{2,}$')
+
+# Spotify: https://open.spotify.com/intl-es/track/ID o spotify:track:ID
+_SPOTIFY_RE = re.compile(
+    r'(?:open\.spotify\.com/(?:intl-[\w-]+/)?(?:embed/)?|spotify:)'
+    r'(track|album|playlist)[/:]([A-Za-z0-9]{22})',
+    re.IGNORECASE
+)
+
+
+class YouTubeRef(NamedTuple):
+    """IDs canónicos extraídos de una URL de YouTube"""
+    video_id: Optional[str]
+    playlist_id: Optional[str]
+
+    @property
+    def is_playlist(self) -> bool:
+        """
+        True si la URL debe expandirse como playlist
+
+        Un video abierto desde un Mix automático (list=RD...) es un video
+        individual: el Mix es infinito y distinto para cada usuario.
+        """
+        if not self.playlist_id:
+            return False
+        if self.video_id and is_mix_playlist(self.playlist_id):
+            return False
+        return True
+
+
+class SpotifyRef(NamedTuple):
+    """Tipo e ID canónico de una URL de Spotify"""
+    kind: str  # 'track', 'album' o 'playlist'
+    id: str
+
+
+def parse_youtube_url(url: str) -> Optional[YouTubeRef]:
+    """
+    Extraer los IDs de video y playlist de una URL de YouTube
+
+    Args:
+        url: URL a analizar
+
+    Returns:
+        YouTubeRef o None si no es una URL de YouTube
+    """
+    url = (url or '').strip()
+    if not url:
+        return None
+    if '://' not in url:
+        url = f'https://{url}'
+
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+
+    host = (parts.hostname or '').lower()
+    if not _YOUTUBE_HOST_RE.match(host):
+        return None
+
+    query = parse_qs(parts.query)
+    video_id = _first_valid(query.get('v'), _VIDEO_ID_RE)
+    playlist_id = _first_valid(query.get('list'), _PLAYLIST_ID_RE)
+
+    if not video_id:
+        path_re = _SHORT_PATH_RE if host.endswith('youtu.be') else _VIDEO_PATH_RE
+        match = path_re.match(parts.path)
+        if match:
+            video_id = match.group(1)
+
+    if not video_id and not playlist_id:
+        return None
+    return YouTubeRef(video_id, playlist_id)
+
+
+def parse_spotify_url(url: str) -> Optional[SpotifyRef]:
+    """
+    Extraer tipo e ID de una URL o URI de Spotify
+
+    Args:
+        url: URL (open.spotify.com/...) o URI (spotify:track:...)
+
+    Returns:
+        SpotifyRef o None si no se reconoce
+    """
+    match = _SPOTIFY_RE.search(url or '')
+    if not match:
+        return None
+    return SpotifyRef(match.group(1).lower(), match.group(2))
+
+
+def is_mix_playlist(playlist_id: str) -> bool:
+    """
+    Verificar si una playlist es un Mix automático de YouTube
+
+    Args:
+        playlist_id: ID de la playlist
+
+    Returns:
+        bool: True para Mixes (RD...), salvo los álbumes de YouTube Music (RDCLAK...)
+    """
+    return playlist_id.startswith('RD') and not playlist_id.startswith('RDCLAK')
+
+
+def canonical_video_url(video_id: str) -> str:
+    """URL canónica de un video"""
+    return f'https://www.youtube.com/watch?v={video_id}'
+
+
+def canonical_playlist_url(playlist_id: str) -> str:
+    """URL canónica de una playlist"""
+    return f'https://www.youtube.com/playlist?list={playlist_id}'
+
+
+def _first_valid(values, pattern) -> Optional[str]:
+    """Primer valor de un parámetro de query que cumple el patrón"""
+    for value in values or []:
+        if pattern.match(value):
+            return value
+    return None
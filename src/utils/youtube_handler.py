@@ -3,17 +3,32 @@ YouTube Handler - Maneja la extracción de información y streams de YouTube
 Utiliza yt-dlp para extraer información sin descargar archivos
 OPTIMIZADO para máxima velocidad con caché y lazy loading
 """
-import yt_dlp
 import asyncio
-from typing import Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import logging
 import os
 import shutil
-from .cache import video_cache
+from .cache import video_cache, stream_cache, failure_cache, search_cache, parse_stream_expiry
+from .track_info import TrackInfo
+from .extraction_executor import extraction_executor
+from .extraction_health import extraction_health
+from .extraction_scheduler import extraction_scheduler, ExtractionRequest, PRIORITY_INTERACTIVE
+from .url_parser import parse_youtube_url
+from .audio_source import AUDIO_FORMATS, playback_mode
+from . import ytdl_worker
 
 
 logger = logging.getLogger('MusicBot.YouTube')
 
+# Motivos de fallo permanente (ytdl_worker.classify_error) para mostrar al usuario
+FAILURE_REASONS = {
+    'private': 'video privado',
+    'region': 'bloqueado en esta región',
+    'age_restricted': 'restringido por edad',
+    'removed': 'eliminado',
+    'unavailable': 'no disponible',
+}
+
 
 class YouTubeHandler:
     """
@@ -21,11 +36,14 @@ class YouTubeHandler:
     Proporciona métodos para búsqueda, extracción de info, y obtención de URLs de stream
     """
 
+    # Extracciones en curso compartidas por todas las instancias {clave: (Task, petición)}
+    _inflight: Dict[str, Tuple['asyncio.Future', ExtractionRequest]] = {}
+
     def __init__(self):
         """Inicializar el handler con opciones de yt-dlp"""
         # Configuración base de yt-dlp
         base_opts = {
-            'format': 'bestaudio/best',
+            'format': AUDIO_FORMATS[playback_mode()],
             'noplaylist': False,  # Permitir playlists
             'quiet': True,
             'no_warnings': True,
@@ -60,7 +78,7 @@ class YouTubeHandler:
 
         # Opciones para obtener stream URL
         stream_opts_base = {
-            'format': 'bestaudio/best',
+            'format': AUDIO_FORMATS[playback_mode()],
             'quiet': True,
             'no_warnings': True,
             'extract_flat': False,
@@ -69,6 +87,21 @@ class YouTubeHandler:
         stream_opts_base.update(cookies_config)
         self.stream_opts = stream_opts_base
 
+        # Opciones para playlists (solo metadata básica)
+        self.flat_opts = {
+            **self.ydl_opts,
+            'extract_flat': 'in_playlist',
+            'quiet': True,
+        }
+
+        # Registrar los perfiles en el pool de extracción compartido
+        extraction_executor.configure({
+            'full': self.ydl_opts,
+            'search': self.search_opts,
+            'stream': self.stream_opts,
+            'flat': self.flat_opts,
+        })
+
     def _setup_cookies(self) -> dict:
         """
         Configurar cookies para evitar bloqueos de YouTube
@@ -238,116 +271,360 @@ class YouTubeHandler:
             logger.error(f'❌ Error validando archivo de cookies: {e}')
             return False
 
-    async def extract_info(self, url: str, use_cache: bool = True) -> Optional[Dict]:
+    async def extract_info(self, url: str, use_cache: bool = True, priority: str = PRIORITY_INTERACTIVE,
+                           guild_id: Optional[int] = None) -> Optional[TrackInfo]:
         """
-        Extraer información de un video o playlist de YouTube
+        Extraer información de un video de YouTube
         OPTIMIZADO con sistema de caché para máxima velocidad
+        Peticiones simultáneas del mismo video comparten una sola extracción
 
         Args:
-            url: URL del video o playlist de YouTube
+            url: URL del video de YouTube
             use_cache: Si usar caché (default: True)
+            priority: 'interactive', 'prefetch' o 'bulk' (ver ExtractionScheduler)
+            guild_id: Servidor que hace la petición (turnos justos entre servidores)
 
         Returns:
-            Dict: Información del video/playlist o None si hay error
+            TrackInfo: Metadata compacta del video (con el stream elegido) o None si hay error
         """
-        # Intentar obtener del caché primero
+        cache_key = self._request_key(url)
+
+        # Video que falló hace poco de forma permanente: no repetir la extracción
+        if failure_cache.get(cache_key):
+            logger.debug(f'🚫 Extracción omitida (no disponible): {cache_key}')
+            return None
+
+        # Intentar obtener del caché primero (memoria y, si está activo, disco)
         if use_cache:
-            cached = await video_cache.get(url)
+            cached = await video_cache.get(cache_key)
             if cached:
                 return cached
 
+        key = f'info:{cache_key}:{use_cache}'
+        return await self._single_flight(
+            key, priority, guild_id, lambda request: self._extract_info(url, cache_key, use_cache, request)
+        )
+
+    async def _extract_info(self, url: str, cache_key: str, use_cache: bool,
+                            request: ExtractionRequest) -> Optional[TrackInfo]:
+        """Extracción real con yt-dlp (usar extract_info)"""
         try:
-            loop = asyncio.get_event_loop()
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                info = await loop.run_in_executor(
-                    None,
-                    lambda: ydl.extract_info(url, download=False)
-                )
-
-                # Guardar en caché
-                if info and use_cache:
-                    await video_cache.set(url, info)
-
-                return info
+            # El worker devuelve ya el registro compacto (descarta formats, captions...)
+            track = await self._run(request, ytdl_worker.extract_track, url)
+
+            if not track:
+                return None
+
+            # Guardar en caché
+            if use_cache:
+                await video_cache.set(cache_key, track)
+
+            # La extracción completa ya trae el stream - guardarlo por ID
+            if track.id and track.stream_url:
+                stream_cache.set(track.id, track.stream_url, track.stream_expires)
+
+            return track
         except Exception as e:
             logger.error(f'Error extrayendo info de {url}: {e}')
+            self._record_failure(self.extract_video_id(url), e)
             return None
 
-    async def search(self, query: str, limit: int = 5, full_info: bool = False) -> List[Dict]:
+    async def search(self, query: str, limit: int = 5, full_info: bool = False,
+                     priority: str = PRIORITY_INTERACTIVE, guild_id: Optional[int] = None) -> List[Dict]:
         """
         Buscar videos en YouTube
         OPTIMIZADO: Por defecto devuelve info básica para velocidad
+        Los resultados se cachean por query normalizada + límite, y las
+        búsquedas idénticas simultáneas comparten una sola llamada a yt-dlp
 
         Args:
             query: Término de búsqueda
             limit: Número máximo de resultados (default: 5)
             full_info: Si obtener info completa (lento) o básica (rápido, default: False)
+            priority: 'interactive', 'prefetch' o 'bulk' (ver ExtractionScheduler)
+            guild_id: Servidor que hace la petición (turnos justos entre servidores)
 
         Returns:
-            List[Dict]: Lista de resultados de búsqueda
+            List: Resultados de búsqueda (dicts básicos, o TrackInfo si full_info)
         """
+        cache_key = f'{limit}:{self.normalize_query(query)}'
+
+        # Búsqueda repetida (recomendaciones, radio): sin tocar YouTube
+        if not full_info:
+            cached = await search_cache.get(cache_key)
+            if cached:
+                return list(cached)
+
+        key = f'search:{full_info}:{cache_key}'
+        results = await self._single_flight(
+            key, priority, guild_id, lambda request: self._search(query, cache_key, limit, full_info, request)
+        )
+        # Cada llamador recibe su propia lista
+        return list(results)
+
+    async def _search(self, query: str, cache_key: str, limit: int, full_info: bool,
+                      request: ExtractionRequest) -> List[Dict]:
+        """Búsqueda real con yt-dlp (usar search)"""
         try:
-            # Construir query de búsqueda
-            search_query = f"ytsearch{limit}:{query}"
-
-            loop = asyncio.get_event_loop()
-            with yt_dlp.YoutubeDL(self.search_opts) as ydl:
-                info = await loop.run_in_executor(
-                    None,
-                    lambda: ydl.extract_info(search_query, download=False)
-                )
-
-                if 'entries' in info:
-                    if full_info:
-                        # Modo lento: obtener info completa de cada resultado
-                        results = []
-                        for entry in info['entries'][:limit]:
-                            full = await self.extract_info(entry['url'])
-                            if full:
-                                results.append(full)
-                        return results
-                    else:
-                        # Modo rápido: usar info básica que ya tenemos
-                        return [entry for entry in info['entries'][:limit] if entry]
-                return []
+            # En modo completo las entradas básicas también pueden venir del caché
+            entries = await search_cache.get(cache_key) if full_info else None
+            if not entries:
+                entries = await self._run(request, ytdl_worker.search_entries, query, limit)
+                if entries:
+                    await search_cache.set(cache_key, entries)
+
+            if full_info:
+                # Modo lento: obtener info completa de cada resultado
+                results = []
+                for entry in entries:
+                    full = await self.extract_info(
+                        entry['url'], priority=request.priority, guild_id=request.guild_id
+                    )
+                    if full:
+                        results.append(full)
+                return results
+
+            # Modo rápido: usar info básica que ya tenemos
+            return entries
 
         except Exception as e:
             logger.error(f'Error buscando "{query}": {e}')
             return []
 
-    async def get_stream_url(self, url: str) -> Optional[str]:
+    async def get_stream_url(self, url: str, priority: str = PRIORITY_INTERACTIVE,
+                             guild_id: Optional[int] = None) -> Optional[str]:
         """
         Obtener URL de stream de audio de un video
+        OPTIMIZADO: consulta primero el caché de URLs por ID de video
+        y comparte la extracción entre peticiones simultáneas
 
         Args:
             url: URL del video de YouTube
+            priority: 'interactive', 'prefetch' o 'bulk' (ver ExtractionScheduler)
+            guild_id: Servidor que hace la petición (turnos justos entre servidores)
 
         Returns:
             str: URL del stream de audio o None si hay error
         """
+        video_id = self.extract_video_id(url)
+        if failure_cache.get(video_id):
+            logger.debug(f'🚫 Stream omitido (no disponible): {video_id}')
+            return None
+
+        if video_id:
+            cached = stream_cache.get(video_id)
+            if cached:
+                return cached
+
+        key = f'stream:{self._request_key(url)}'
+        return await self._single_flight(
+            key, priority, guild_id, lambda request: self._get_stream_url(url, video_id, request)
+        )
+
+    async def _get_stream_url(self, url: str, video_id: Optional[str],
+                              request: ExtractionRequest) -> Optional[str]:
+        """Resolución real del stream con yt-dlp (usar get_stream_url)"""
         try:
-            loop = asyncio.get_event_loop()
-            with yt_dlp.YoutubeDL(self.stream_opts) as ydl:
-                info = await loop.run_in_executor(
-                    None,
-                    lambda: ydl.extract_info(url, download=False)
-                )
-
-                if 'url' in info:
-                    return info['url']
-                elif 'formats' in info:
-                    # Buscar el mejor formato de audio
-                    for fmt in info['formats']:
-                        if fmt.get('acodec') != 'none' and fmt.get('url'):
-                            return fmt['url']
+            stream_url, expires, resolved_id = await self._run(
+                request, ytdl_worker.resolve_stream, url
+            )
 
-                return None
+            if stream_url:
+                stream_cache.set(resolved_id or video_id, stream_url, expires)
+            return stream_url
 
         except Exception as e:
             logger.error(f'Error obteniendo stream URL de {url}: {e}')
+            self._record_failure(video_id, e)
+            return None
+
+    def invalidate_stream(self, url: str) -> None:
+        """
+        Descartar la URL de stream cacheada de un video (p. ej. caducó a mitad de canción)
+
+        Args:
+            url: URL del video de YouTube
+        """
+        video_id = self.extract_video_id(url)
+        if video_id:
+            stream_cache.remove(video_id)
+
+    def get_failure(self, url: str) -> Optional[str]:
+        """
+        Consultar si un video falló recientemente de forma permanente
+
+        Args:
+            url: URL del video de YouTube
+
+        Returns:
+            str: Motivo legible del fallo o None si no hay fallo conocido
+        """
+        reason = failure_cache.get(self.extract_video_id(url))
+        if not reason:
             return None
+        return FAILURE_REASONS.get(reason, reason)
+
+    @staticmethod
+    def _record_failure(video_id: Optional[str], error: Exception) -> None:
+        """Guardar en el caché negativo los fallos permanentes de un video"""
+        reason = ytdl_worker.classify_error(str(error))
+        if reason and video_id:
+            failure_cache.set(video_id, reason)
+
+    async def _single_flight(self, key: str, priority: str, guild_id: Optional[int],
+                             factory: Callable[[ExtractionRequest], Awaitable[Any]]) -> Any:
+        """
+        Ejecutar una extracción una sola vez por clave aunque haya varios llamadores
+
+        Si ya hay una extracción en curso con la misma clave, se espera su
+        resultado en vez de lanzar otra. El registro es compartido por todas
+        las instancias del handler (cogs de música y radio). Si un llamador
+        de más prioridad se une a una extracción que aún espera turno, la promociona.
+
+        Args:
+            key: Clave canónica de la petición
+            priority: Prioridad del llamador
+            guild_id: Servidor del llamador que lanza la extracción
+            factory: Función que crea la corrutina de extracción a partir de la petición
+
+        Returns:
+            El resultado de la extracción compartida
+        """
+        entry = YouTubeHandler._inflight.get(key)
+        if entry is None:
+            request = ExtractionRequest(priority, guild_id)
+            task = asyncio.ensure_future(factory(request))
+            YouTubeHandler._inflight[key] = (task, request)
+
+            def _release(done, key=key):
+                current = YouTubeHandler._inflight.get(key)
+                if current and current[0] is done:
+                    del YouTubeHandler._inflight[key]
+
+            task.add_done_callback(_release)
+        else:
+            task, request = entry
+            logger.debug(f'🔗 Reusando extracción en curso: {key[:60]}')
+            extraction_scheduler.promote(request, priority)
+
+        # shield: si un llamador se cancela (timeout), los demás siguen esperando
+        return await asyncio.shield(task)
+
+    async def _run(self, request: ExtractionRequest, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecutar una función de ytdl_worker a través del planificador global
+
+        Espera turno en ExtractionScheduler (prioridad, servidor y
+        concurrencia actual) y registra el resultado en el control de salud:
+        los 429/anti-bots reducen la concurrencia y pausan el trabajo
+        masivo; los éxitos la recuperan.
+
+        Args:
+            request: Petición con su prioridad y servidor
+            func: Función de ytdl_worker
+            *args: Argumentos para la función
+
+        Returns:
+            El valor devuelto por la función
+        """
+        await extraction_scheduler.acquire(request)
+        try:
+            result = await extraction_executor.run(func, *args)
+        except Exception as e:
+            if ytdl_worker.is_throttle_error(str(e)):
+                extraction_health.record_throttle(str(e))
+            raise
+        else:
+            extraction_health.record_success()
+        finally:
+            extraction_scheduler.release()
+
+        return result
+
+    def _request_key(self, url: str) -> str:
+        """
+        Clave canónica para deduplicar peticiones de un mismo video
+
+        Args:
+            url: URL recibida
+
+        Returns:
+            str: ID del video si se reconoce, o la URL tal cual
+        """
+        ref = parse_youtube_url(url)
+        if ref and ref.video_id and not ref.is_playlist:
+            return ref.video_id
+        return url
+
+    @staticmethod
+    def to_track_info(info: Dict) -> TrackInfo:
+        """
+        Reducir una extracción completa de yt-dlp a un TrackInfo
+
+        Args:
+            info: Diccionario devuelto por yt-dlp
+
+        Returns:
+            TrackInfo: Registro compacto con el formato de audio elegido
+        """
+        return ytdl_worker.to_track_info(info)
+
+    @staticmethod
+    def select_audio_stream(info: Optional[Dict]) -> Tuple[Optional[str], float]:
+        """
+        Elegir la URL de audio de una extracción completa de yt-dlp
+
+        Args:
+            info: Diccionario devuelto por extract_info (no flat)
+
+        Returns:
+            Tuple[str, float]: (URL del stream, timestamp de expiración)
+            o (None, 0) si la info no contiene formatos reproducibles
+        """
+        return ytdl_worker.select_audio_stream(info)
+
+    @staticmethod
+    def parse_stream_expiry(stream_url: str) -> float:
+        """
+        Leer la expiración real de una URL de googlevideo
+
+        Args:
+            stream_url: URL directa del audio
+
+        Returns:
+            float: Timestamp UNIX de expiración (TTL por defecto si no se encuentra)
+        """
+        return parse_stream_expiry(stream_url)
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Normalizar una búsqueda para usarla como clave de caché
+
+        Args:
+            query: Término de búsqueda
+
+        Returns:
+            str: Query en minúsculas y con los espacios colapsados
+        """
+        return ' '.join(query.lower().split())
+
+    @staticmethod
+    def extract_video_id(url: str) -> Optional[str]:
+        """
+        Extraer el ID de video de una URL de YouTube
+
+        Args:
+            url: URL del video
+
+        Returns:
+            str: ID de 11 caracteres o None si no se reconoce
+        """
+        ref = parse_youtube_url(url)
+        return ref.video_id if ref else None
 
-    async def get_playlist(self, url: str, max_songs: int = 50) -> List[Dict]:
+    async def get_playlist(self, url: str, max_songs: int = 50, priority: str = PRIORITY_INTERACTIVE,
+                           guild_id: Optional[int] = None) -> List[Dict]:
         """
         Obtener información de todos los videos en una playlist
         OPTIMIZADO con extract_flat para máxima velocidad (10-20x más rápido)
@@ -355,43 +632,20 @@ class YouTubeHandler:
         Args:
             url: URL de la playlist de YouTube
             max_songs: Número máximo de canciones a extraer (default: 50)
+            priority: 'interactive', 'prefetch' o 'bulk' (ver ExtractionScheduler)
+            guild_id: Servidor que hace la petición (turnos justos entre servidores)
 
         Returns:
             List[Dict]: Lista de información BÁSICA de videos
             Usar extract_info() individual cuando se necesite info completa
         """
         try:
-            # Usar extract_flat=True para obtener solo metadata básica (muy rápido)
-            flat_opts = {
-                **self.ydl_opts,
-                'extract_flat': 'in_playlist',  # Solo info básica para playlists
-                'quiet': True,
-            }
-
-            loop = asyncio.get_event_loop()
-            with yt_dlp.YoutubeDL(flat_opts) as ydl:
-                info = await loop.run_in_executor(
-                    None,
-                    lambda: ydl.extract_info(url, download=False)
-                )
-
-                if 'entries' in info:
-                    entries = []
-                    for entry in info['entries'][:max_songs]:
-                        if entry and 'url' in entry:
-                            # Añadir info básica útil
-                            entries.append({
-                                'url': entry.get('url') or f"https://www.youtube.com/watch?v={entry.get('id')}",
-                                'title': entry.get('title', 'Unknown'),
-                                'duration': entry.get('duration', 0),
-                                'id': entry.get('id'),
-                                'uploader': entry.get('uploader', 'Unknown'),
-                                'webpage_url': entry.get('webpage_url') or entry.get('url'),
-                                '_lazy': True  # Marca para indicar que es info básica
-                            })
-                    logger.info(f'✓ Playlist procesada rápidamente: {len(entries)} videos')
-                    return entries
-                return []
+            # Usar extract_flat para obtener solo metadata básica (muy rápido)
+            entries = await self._run(
+                ExtractionRequest(priority, guild_id), ytdl_worker.playlist_entries, url, max_songs
+            )
+            logger.info(f'✓ Playlist procesada rápidamente: {len(entries)} videos')
+            return entries
 
         except Exception as e:
             logger.error(f'Error obteniendo playlist {url}: {e}')
@@ -408,8 +662,7 @@ class YouTubeHandler:
         Returns:
             bool: True si es una URL de YouTube
         """
-        youtube_domains = ['youtube.com', 'youtu.be', 'youtube', 'www.youtube.com']
-        return any(domain in query.lower() for domain in youtube_domains)
+        return parse_youtube_url(query) is not None
 
     @staticmethod
     def is_playlist(url: str) -> bool:
@@ -422,7 +675,8 @@ class YouTubeHandler:
         Returns:
             bool: True si es una playlist
         """
-        return 'list=' in url or 'playlist' in url.lower()
+        ref = parse_youtube_url(url)
+        return bool(ref and ref.is_playlist)
 
     @staticmethod
     def format_duration(seconds: int) -> str:
@@ -0,0 +1,389 @@
+"""
+yt-dlp Worker - Funciones de extracción que se ejecutan en el pool de extracción
+Funcionan igual en un hilo o en un proceso worker: reciben solo argumentos
+simples y devuelven registros compactos (TrackInfo, listas de dicts básicos,
+tuplas), nunca el diccionario completo de yt-dlp
+"""
+import logging
+import multiprocessing.util
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import yt_dlp
+
+from .track_info import TrackInfo
+from .cache import parse_stream_expiry
+
+
+logger = logging.getLogger('MusicBot.Worker')
+
+# Perfiles de opciones de YoutubeDL {'full': {...}, 'search': {...}, ...}
+_profiles: Dict[str, Dict] = {}
+
+# Instancias de YoutubeDL reutilizables, una por perfil y por hilo worker.
+# YoutubeDL no es thread-safe, así que cada hilo tiene las suyas: el pool
+# queda dimensionado igual que el executor (workers × perfiles)
+_local = threading.local()
+
+# YouTube rota las cookies durante la sesión: las de la última extracción
+# correcta se vuelcan al archivo de cookies como mucho cada 5 minutos y al
+# cerrar el pool (las instancias reutilizadas nunca se cierran)
+_COOKIE_SAVE_INTERVAL = 300
+_cookie_file: Optional[str] = None
+_cookie_lock = threading.Lock()
+_cookies_saved_at = 0.0
+_last_ydl: Optional[yt_dlp.YoutubeDL] = None
+
+
+class ExtractionError(Exception):
+    """Error de yt-dlp serializable entre procesos (solo conserva el mensaje)"""
+
+
+# Mensajes de yt-dlp que indican que el video no se podrá reproducir
+# aunque se reintente: (fragmento en minúsculas, motivo)
+_PERMANENT_ERRORS = (
+    ('private video', 'private'),
+    ('members-only', 'private'),
+    ('join this channel', 'private'),
+    ('available in your country', 'region'),
+    ('blocked it in your country', 'region'),
+    ('confirm your age', 'age_restricted'),
+    ('removed by the uploader', 'removed'),
+    ('account associated with this video has been terminated', 'removed'),
+    ('copyright claim', 'removed'),
+    ('violating youtube', 'removed'),
+    ('video unavailable', 'unavailable'),
+    ('this video is not available', 'unavailable'),
+    ('this video is unavailable', 'unavailable'),
+)
+
+# Fragmentos que delatan que YouTube está limitando peticiones
+_THROTTLE_HINTS = ('http error 429', 'too many requests', 'not a bot', 'try again later', 'rate-limit')
+
+# Fragmentos que delatan un bloqueo temporal aunque el mensaje diga "unavailable"
+_TRANSIENT_HINTS = _THROTTLE_HINTS + ('timed out', 'temporarily')
+
+
+def is_throttle_error(message: str) -> bool:
+    """
+    Verificar si un error de yt-dlp indica que YouTube está limitando peticiones
+
+    Args:
+        message: Mensaje del error de yt-dlp
+
+    Returns:
+        bool: True para 429, comprobación anti-bots o "try again later"
+    """
+    message = (message or '').lower()
+    return any(hint in message for hint in _THROTTLE_HINTS)
+
+
+def classify_error(message: str) -> Optional[str]:
+    """
+    Clasificar un error de yt-dlp como fallo permanente del video
+
+    Args:
+        message: Mensaje del error de yt-dlp
+
+    Returns:
+        str: Motivo ('private', 'region', 'age_restricted', 'removed',
+        'unavailable') o None si el fallo puede ser transitorio
+    """
+    message = (message or '').lower()
+    if any(hint in message for hint in _TRANSIENT_HINTS):
+        return None
+
+    for fragment, reason in _PERMANENT_ERRORS:
+        if fragment in message:
+            return reason
+    return None
+
+
+def configure(profiles: Dict[str, Dict]) -> None:
+    """
+    Registrar los perfiles de opciones en este proceso (backend de hilos)
+
+    Args:
+        profiles: Opciones de YoutubeDL por nombre de perfil
+    """
+    global _cookie_file
+    _profiles.update(profiles)
+    _cookie_file = _find_cookie_file(profiles)
+
+
+def init_process(profiles: Dict[str, Dict]) -> None:
+    """
+    Inicializador de cada proceso worker (backend de procesos)
+
+    Cada proceso usa su propia copia del archivo de cookies (yt-dlp la
+    reescribe), que se borra al terminar el proceso tras volcar las cookies
+    rotadas al archivo original, y deja creadas sus instancias de YoutubeDL
+    para no pagar la carga de extractores en la primera petición.
+
+    Args:
+        profiles: Opciones de YoutubeDL por nombre de perfil
+    """
+    global _cookie_file
+    _cookie_file = _find_cookie_file(profiles)
+    if _cookie_file:
+        # Prioridad mayor: se ejecuta antes de borrar la copia
+        multiprocessing.util.Finalize(None, save_cookies, exitpriority=1)
+
+    cookie_copy = None
+    for name, opts in profiles.items():
+        opts = dict(opts)
+        if opts.get('cookiefile'):
+            if cookie_copy is None:
+                cookie_copy = f'/tmp/youtube_cookies_{os.getpid()}.txt'
+                try:
+                    shutil.copy2(opts['cookiefile'], cookie_copy)
+                except OSError:
+                    cookie_copy = opts['cookiefile']
+                else:
+                    # Los finalizadores de multiprocessing se ejecutan al cerrar el
+                    # worker con cualquier método de arranque (atexit no, con fork)
+                    multiprocessing.util.Finalize(None, _remove_file, args=(cookie_copy,), exitpriority=0)
+            opts['cookiefile'] = cookie_copy
+        _profiles[name] = opts
+
+    for name in profiles:
+        _get_ydl(name).get_info_extractor('Youtube')  # Precargar el extractor principal
+
+
+def _find_cookie_file(profiles: Dict[str, Dict]) -> Optional[str]:
+    """Archivo de cookies configurado en los perfiles (el mismo para todos)"""
+    for opts in profiles.values():
+        if opts.get('cookiefile'):
+            return opts['cookiefile']
+    return None
+
+
+def save_cookies() -> None:
+    """Volcar al archivo de cookies las de la última extracción correcta"""
+    global _cookies_saved_at
+    ydl = _last_ydl
+    if not _cookie_file or ydl is None:
+        return
+
+    with _cookie_lock:
+        _cookies_saved_at = time.time()
+        # Archivo temporal + os.replace: otros hilos/procesos nunca leen un archivo a medias
+        tmp_path = f'{_cookie_file}.{os.getpid()}.tmp'
+        try:
+            ydl.cookiejar.save(tmp_path)
+            os.replace(tmp_path, _cookie_file)
+        except OSError as e:
+            logger.warning(f'⚠️  No se pudieron guardar las cookies de YouTube: {e}')
+
+
+def _remove_file(path: str) -> None:
+    """Borrar un archivo temporal si sigue existiendo"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _get_ydl(profile: str) -> yt_dlp.YoutubeDL:
+    """
+    Obtener la instancia de YoutubeDL de este hilo para un perfil
+
+    Se crea en el primer uso y se reutiliza en las siguientes llamadas,
+    conservando cookies, sesión HTTP y extractores ya cargados.
+
+    Args:
+        profile: Nombre del perfil de opciones
+
+    Returns:
+        YoutubeDL: Instancia confinada al hilo actual
+    """
+    ydls = getattr(_local, 'ydls', None)
+    if ydls is None:
+        ydls = _local.ydls = {}
+
+    ydl = ydls.get(profile)
+    if ydl is None:
+        ydl = ydls[profile] = yt_dlp.YoutubeDL(_profiles[profile])
+        logger.debug(f'YoutubeDL creado ({profile}) en {threading.current_thread().name}')
+    return ydl
+
+
+def _extract(profile: str, target: str) -> Optional[Dict]:
+    """Ejecutar yt-dlp con la instancia reutilizable del perfil indicado"""
+    global _last_ydl
+    ydl = _get_ydl(profile)
+    info = ydl.extract_info(target, download=False)
+
+    _last_ydl = ydl
+    if time.time() - _cookies_saved_at >= _COOKIE_SAVE_INTERVAL:
+        save_cookies()
+    return info
+
+
+def select_audio_stream(info: Optional[Dict]) -> Tuple[Optional[str], float]:
+    """
+    Elegir la URL de audio de una extracción completa de yt-dlp
+
+    Args:
+        info: Diccionario devuelto por extract_info (no flat)
+
+    Returns:
+        Tuple[str, float]: (URL del stream, timestamp de expiración)
+        o (None, 0) si la info no contiene formatos reproducibles
+    """
+    if not info or info.get('_lazy') or info.get('_type') == 'url':
+        # Entradas flat: 'url' es la página del video, no el audio
+        return None, 0
+
+    stream_url = None
+    if info.get('formats') and info.get('url'):
+        # Formato ya seleccionado por yt-dlp ('bestaudio/best')
+        stream_url = info['url']
+    elif info.get('requested_formats'):
+        stream_url = info['requested_formats'][0].get('url')
+    elif info.get('formats'):
+        # Buscar el mejor formato de audio
+        for fmt in info['formats']:
+            if fmt.get('acodec') != 'none' and fmt.get('url'):
+                stream_url = fmt['url']
+                break
+    elif info.get('url'):
+        stream_url = info['url']
+
+    if not stream_url:
+        return None, 0
+    return stream_url, parse_stream_expiry(stream_url)
+
+
+def to_track_info(info: Dict) -> TrackInfo:
+    """
+    Reducir una extracción completa de yt-dlp a un TrackInfo
+
+    Args:
+        info: Diccionario devuelto por yt-dlp
+
+    Returns:
+        TrackInfo: Registro compacto con el formato de audio elegido
+    """
+    # Si es una lista (p. ej. URL con list=), quedarse con el primer video
+    if info.get('_type') == 'playlist' and info.get('entries'):
+        info = next((entry for entry in info['entries'] if entry), info)
+
+    return TrackInfo.from_ytdlp(info, *select_audio_stream(info))
+
+
+def extract_track(url: str) -> Optional[TrackInfo]:
+    """
+    Extracción completa de un video
+
+    Args:
+        url: URL del video
+
+    Returns:
+        TrackInfo o None si yt-dlp no devuelve nada
+    """
+    try:
+        info = _extract('full', url)
+    except Exception as e:
+        raise ExtractionError(str(e)) from None
+    return to_track_info(info) if info else None
+
+
+def compact_entry(entry: Dict) -> Dict:
+    """
+    Reducir una entrada flat de yt-dlp a los campos que usa el bot
+
+    Args:
+        entry: Entrada de una búsqueda o playlist flat
+
+    Returns:
+        Dict: url, title, duration, id, uploader, webpage_url y thumbnail
+    """
+    video_id = entry.get('id')
+    url = entry.get('url') or f"https://www.youtube.com/watch?v={video_id}"
+
+    thumbnail = entry.get('thumbnail')
+    if not thumbnail and entry.get('thumbnails'):
+        thumbnail = entry['thumbnails'][-1].get('url')
+
+    return {
+        'url': url,
+        'title': entry.get('title') or 'Unknown',
+        'duration': entry.get('duration') or 0,
+        'id': video_id,
+        'uploader': entry.get('uploader') or entry.get('channel') or 'Unknown',
+        'webpage_url': entry.get('webpage_url') or url,
+        'thumbnail': thumbnail or ''
+    }
+
+
+def search_entries(query: str, limit: int) -> List[Dict]:
+    """
+    Búsqueda flat en YouTube
+
+    Args:
+        query: Término de búsqueda
+        limit: Número máximo de resultados
+
+    Returns:
+        List[Dict]: Entradas básicas de los resultados
+    """
+    try:
+        info = _extract('search', f"ytsearch{limit}:{query}")
+    except Exception as e:
+        raise ExtractionError(str(e)) from None
+
+    if not info or 'entries' not in info:
+        return []
+    return [compact_entry(entry) for entry in info['entries'][:limit] if entry]
+
+
+def playlist_entries(url: str, max_songs: int) -> List[Dict]:
+    """
+    Extracción flat de una playlist
+
+    Args:
+        url: URL de la playlist
+        max_songs: Número máximo de entradas
+
+    Returns:
+        List[Dict]: Información básica (lazy) de cada video
+    """
+    try:
+        info = _extract('flat', url)
+    except Exception as e:
+        raise ExtractionError(str(e)) from None
+
+    if not info or 'entries' not in info:
+        return []
+
+    entries = []
+    for entry in info['entries'][:max_songs]:
+        if entry and 'url' in entry:
+            # Marca '_lazy' para indicar que es info básica
+            entries.append({**compact_entry(entry), '_lazy': True})
+    return entries
+
+
+def resolve_stream(url: str) -> Tuple[Optional[str], float, Optional[str]]:
+    """
+    Resolver solo la URL de audio de un video
+
+    Args:
+        url: URL del video
+
+    Returns:
+        Tuple: (URL del stream, expiración, ID del video)
+    """
+    try:
+        info = _extract('stream', url)
+    except Exception as e:
+        raise ExtractionError(str(e)) from None
+
+    if not info:
+        return None, 0, None
+    stream_url, expires = select_audio_stream(info)
+    return stream_url, expires, info.get('id')